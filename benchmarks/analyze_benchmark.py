@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+离线解析基准测试
+
+通过本地回放服务运行四个平台的解析类，按平台和阶段统计 p50/p95 耗时、内存峰值和吞吐：
+    fetch    获取页面（含重定向），经过共享客户端、限流熔断等完整出站路径，读到状态脚本即停止
+    parse    构建 PageExtractor、提取标题并定位状态脚本
+    extract  平台的 extract_*_data：解码状态并提取图片、视频等字段，以及 to_dict
+    total    Xxx.create() + to_dict() 端到端
+
+默认使用 benchmarks/sample_pages.py 生成的示例页面；用 benchmarks/replay.py 录制的
+真实夹具放在 --fixtures 目录下即可替换
+
+用法:
+    python benchmarks/analyze_benchmark.py
+    python benchmarks/analyze_benchmark.py --fixtures benchmarks/fixtures --rounds 50 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.replay import Exchange, Fixture, ReplayServer, ReplayTransport, load_fixture
+from benchmarks.sample_pages import PLATFORMS, build_page
+from src.app.registry import get_parser
+from src.utils import config, find_url
+from src.utils.extractor import PageExtractor, state_ready
+from src.utils.http_client import close_http_client, init_http_client
+from src.utils.short_link import short_link_cache
+from src.utils.snapshot_store import fetch_page
+
+# 各平台状态脚本的标识和提取方法
+PHASES = {
+    "xiaohongshu": ("window.__INITIAL_STATE__", "extract_xiaohongshu_data"),
+    "douyin": ("window._ROUTER_DATA", "extract_douyin_data"),
+    "kuaishou": ("window.INIT_STATE", "extract_kuaishou_data"),
+    "weibo": ("$render_data", "extract_weibo_data"),
+}
+
+# 示例夹具的分享链接和最终链接，与真实平台一样先经过一次短链重定向
+SAMPLE_LINKS = {
+    "xiaohongshu": ("http://xhslink.com/a/bench", "https://www.xiaohongshu.com/explore/64f0a1b2c3d4e5f601234567"),
+    "douyin": ("https://v.douyin.com/bench/", "https://www.iesdouyin.com/share/video/7300000000000000000/"),
+    "kuaishou": ("https://v.kuaishou.com/bench", "https://www.kuaishou.com/short-video/3xabcd"),
+    "weibo": ("https://m.weibo.cn/status/Nbench", None),
+}
+
+
+def sample_fixtures(feed_size: int, body_size: int) -> list:
+    """用示例页面构建夹具"""
+    fixtures = []
+    for platform in PLATFORMS:
+        share_url, final_url = SAMPLE_LINKS[platform]
+        exchanges = []
+        if final_url:
+            exchanges.append(Exchange(url=share_url, status=302, headers={"location": final_url}))
+        exchanges.append(Exchange(
+            url=final_url or share_url,
+            status=200,
+            headers={"content-type": "text/html; charset=utf-8"},
+            body=build_page(platform, feed_size, body_size),
+        ))
+        fixtures.append(Fixture(platform=platform, input=share_url, exchanges=exchanges))
+    return fixtures
+
+
+def percentile(values: list, p: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+async def run_phases(fixture: Fixture, type: str) -> dict:
+    """分阶段执行一次解析，返回各阶段耗时（毫秒）"""
+    parser_cls = get_parser(fixture.platform)
+    headers = sys.modules[parser_cls.__module__].HEADERS
+    marker, extract_method = PHASES[fixture.platform]
+    short_link_cache.clear()
+
+    start = time.perf_counter()
+    page = await fetch_page(find_url(fixture.input), headers=headers, until=state_ready(marker))
+    fetch_ms = elapsed_ms(start)
+
+    start = time.perf_counter()
+    parser = parser_cls(fixture.input, type, fetch=False)
+    parser.final_url = page.url
+    parser.html = page.text
+    parser.page = PageExtractor(parser.html)
+    parser.title = parser.page.title()
+    parser.page.script(marker)
+    parse_ms = elapsed_ms(start)
+
+    start = time.perf_counter()
+    getattr(parser, extract_method)()
+    parser.to_dict()
+    extract_ms = elapsed_ms(start)
+    return {"fetch": fetch_ms, "parse": parse_ms, "extract": extract_ms}
+
+
+async def run_total(fixture: Fixture, type: str) -> float:
+    """端到端执行一次解析，返回耗时（毫秒）"""
+    short_link_cache.clear()
+    start = time.perf_counter()
+    parser = await get_parser(fixture.platform).create(fixture.input, type)
+    parser.to_dict()
+    return elapsed_ms(start)
+
+
+async def measure_peak_kb(fixture: Fixture, type: str) -> float:
+    """一次端到端解析过程中的内存分配峰值（KB）"""
+    short_link_cache.clear()
+    tracemalloc.start()
+    try:
+        parser = await get_parser(fixture.platform).create(fixture.input, type)
+        parser.to_dict()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+async def measure_throughput(fixture: Fixture, type: str, requests: int, concurrency: int) -> float:
+    """以指定并发执行多次端到端解析，返回每秒完成数"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            parser = await get_parser(fixture.platform).create(fixture.input, type)
+            parser.to_dict()
+
+    short_link_cache.clear()
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def benchmark(fixtures: list, args):
+    print(
+        f"{'平台':<12}{'阶段':<9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'峰值KB':>10}{'吞吐/s':>9}"
+    )
+    for fixture in fixtures:
+        phases = {"fetch": [], "parse": [], "extract": [], "total": []}
+        # 预热：加载解析模块、建立连接
+        await run_total(fixture, args.type)
+        for _ in range(args.rounds):
+            for phase, value in (await run_phases(fixture, args.type)).items():
+                phases[phase].append(value)
+            phases["total"].append(await run_total(fixture, args.type))
+        peak_kb = await measure_peak_kb(fixture, args.type)
+        throughput = await measure_throughput(fixture, args.type, args.rounds, args.concurrency)
+
+        for phase, values in phases.items():
+            extra = f"{peak_kb:>10.0f}{throughput:>9.0f}" if phase == "total" else ""
+            print(
+                f"{fixture.platform:<12}{phase:<9}"
+                f"{percentile(values, 50):>9.2f}{percentile(values, 95):>9.2f}{extra}"
+            )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="离线解析基准测试")
+    parser.add_argument("--fixtures", help="录制的夹具目录 (*.json.gz)，不指定时使用示例页面")
+    parser.add_argument("--platform", choices=PLATFORMS, help="只测试指定平台")
+    parser.add_argument("--rounds", type=int, default=30, help="每个平台的执行轮数 (默认: 30)")
+    parser.add_argument("--concurrency", type=int, default=8, help="吞吐测试的并发数 (默认: 8)")
+    parser.add_argument("--feed-size", type=int, default=400, help="示例页面状态中推荐流的条数 (默认: 400)")
+    parser.add_argument("--body-size", type=int, default=600, help="示例页面主体节点数 (默认: 600)")
+    parser.add_argument("--type", default="png", help="图片类型 (默认: png)")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    if args.fixtures:
+        fixtures = [load_fixture(path) for path in sorted(glob.glob(os.path.join(args.fixtures, "*.json.gz")))]
+    else:
+        fixtures = sample_fixtures(args.feed_size, args.body_size)
+    if args.platform:
+        fixtures = [fixture for fixture in fixtures if fixture.platform == args.platform]
+    if not fixtures:
+        print("没有可用的夹具")
+        return
+
+    # 只测解析本身：不读写页面快照，不触发出站限流
+    config.SNAPSHOT_ENABLED = False
+    config.HOST_RATE_LIMIT = 1e9
+    config.HOST_RATE_BURST = 10 ** 9
+
+    with ReplayServer(fixtures) as server:
+        init_http_client(ReplayTransport(server.base_url))
+        try:
+            await benchmark(fixtures, args)
+        finally:
+            await close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+比较响应编码的耗时与体积
+
+负载按接口的真实返回结构构造：
+    analyze    解析示例页面得到的 to_dict() 结果
+    html       format=html 时原样返回的页面
+    idphoto    /idphoto/create 返回的标准照和高清照 base64
+    inpaint    /api/v1/inpaint/inpaint 返回的修复结果 base64
+    tracking   /tracking/events 最多 1000 行的查询结果（含 datetime）
+
+编码方式：
+    json       FastAPI 默认路径：jsonable_encoder + 标准库 json（JSONResponse）
+    orjson     jsonable_encoder + CodecResponse 的 JSON 编码
+    msgpack    jsonable_encoder + CodecResponse 的 msgpack 编码
+    orjson*    跳过 jsonable_encoder，直接返回 CodecResponse 时的开销
+
+用法:
+    python benchmarks/codec_benchmark.py
+    python benchmarks/codec_benchmark.py --rounds 50 --image-kb 2048
+"""
+
+import argparse
+import base64
+import datetime
+import os
+import random
+import statistics
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from benchmarks.analyze_benchmark import PHASES, SAMPLE_LINKS
+from benchmarks.sample_pages import build_page
+from src.app.registry import get_parser
+from src.utils.codec import dumps_json, dumps_msgpack, msgpack
+from src.utils.extractor import PageExtractor
+from src.utils.response import Response
+
+
+def analyze_payload(feed_size: int, body_size: int) -> dict:
+    """离线解析小红书示例页面，得到与 /analyze 相同的结果结构"""
+    platform = "xiaohongshu"
+    marker, extract_method = PHASES[platform]
+    share_url, final_url = SAMPLE_LINKS[platform]
+    parser = get_parser(platform)(share_url, "png", fetch=False)
+    parser.final_url = final_url
+    parser.html = build_page(platform, feed_size, body_size)
+    parser.page = PageExtractor(parser.html)
+    parser.title = parser.page.title()
+    parser.page.script(marker)
+    getattr(parser, extract_method)()
+    return parser.to_dict()
+
+
+def image_base64(size_kb: int) -> str:
+    return "data:image/png;base64," + base64.b64encode(os.urandom(size_kb * 1024)).decode()
+
+
+def tracking_rows(count: int) -> list:
+    now = datetime.datetime.now()
+    platforms = ("pc", "h5", "mini_program", "android", "ios")
+    return [
+        {
+            "id": i,
+            "user_id": random.randint(1, 10 ** 6),
+            "source_platform": platforms[i % len(platforms)],
+            "event_type": "page_view",
+            "ip_address": f"10.0.{i // 256 % 256}.{i % 256}",
+            "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15",
+            "referrer": f"https://example.com/page/{i}",
+            "event_params": {"page": f"/note/{i}", "duration": i % 60, "tags": ["a", "b"]},
+            "created_at": now - datetime.timedelta(seconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+def build_payloads(args) -> dict:
+    return {
+        "analyze": analyze_payload(args.feed_size, args.body_size),
+        "html": Response.success(build_page("douyin", args.feed_size, args.body_size), "获取成功"),
+        "idphoto": Response.success(
+            {
+                "status": True,
+                "image_base64_standard": image_base64(args.image_kb // 4),
+                "image_base64_hd": image_base64(args.image_kb),
+            },
+            "success",
+        ),
+        "inpaint": Response.success({"image_base64": image_base64(args.image_kb)}, "图像修复成功"),
+        "tracking": Response.success(tracking_rows(1000), "获取成功"),
+    }
+
+
+def codecs() -> dict:
+    stdlib = JSONResponse(None)
+    result = {
+        "json": lambda content: stdlib.render(jsonable_encoder(content)),
+        "orjson": lambda content: dumps_json(jsonable_encoder(content)),
+    }
+    if msgpack is not None:
+        result["msgpack"] = lambda content: dumps_msgpack(jsonable_encoder(content))
+    result["orjson*"] = dumps_json
+    return result
+
+
+def measure(fn, content, rounds: int):
+    """返回中位耗时（毫秒）和编码后的大小（KB）"""
+    body = fn(content)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(content)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(body) / 1024
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="响应编码基准测试")
+    parser.add_argument("--rounds", type=int, default=30, help="每种负载的执行轮数 (默认: 30)")
+    parser.add_argument("--feed-size", type=int, default=400, help="示例页面状态中推荐流的条数 (默认: 400)")
+    parser.add_argument("--body-size", type=int, default=600, help="示例页面主体节点数 (默认: 600)")
+    parser.add_argument("--image-kb", type=int, default=1024, help="高清图片的原始大小 KB (默认: 1024)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    payloads = build_payloads(args)
+    encoders = codecs()
+    if msgpack is None:
+        print("未安装 msgpack，跳过 msgpack 编码")
+
+    print(f"{'负载':<10}{'编码':<10}{'中位 ms':>10}{'大小 KB':>10}{'加速':>8}")
+    for name, content in payloads.items():
+        baseline = None
+        for codec, fn in encoders.items():
+            elapsed, size_kb = measure(fn, content, args.rounds)
+            baseline = baseline or elapsed
+            print(f"{name:<10}{codec:<10}{elapsed:>10.2f}{size_kb:>10.0f}{baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+比较整体解码页面状态与只解码所需子树的耗时和内存峰值
+
+微博一栏比较的是 execjs 执行脚本与进程内解析 $render_data
+
+用法:
+    python benchmarks/decode_benchmark.py
+    python benchmarks/decode_benchmark.py --rounds 50 --feed-size 2000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sample_pages import build_page
+from src.utils.extractor import find_script
+from src.utils.json_subtree import decode_key, decode_nth_member
+from src.app.weibo.index import Weibo
+
+
+def xiaohongshu_full(script):
+    data = json.loads(script.split("window.__INITIAL_STATE__=")[1].replace("undefined", "null"))
+    note = data.get("note", {})
+    return note.get("noteDetailMap", {}).get(note.get("firstNoteId", ""), {})
+
+
+def xiaohongshu_subtree(script):
+    start = script.index("{", script.index("window.__INITIAL_STATE__="))
+    first_note_id = decode_key(script, "firstNoteId", start, "")
+    return (decode_key(script, "noteDetailMap", start, {}) or {}).get(first_note_id, {})
+
+
+def douyin_full(script):
+    data = json.loads(script.split("window._ROUTER_DATA = ")[1])
+    return data.get("loaderData", {}).get("video_(id)/page", {})
+
+
+def douyin_subtree(script):
+    start = script.index("{", script.index("window._ROUTER_DATA = "))
+    return decode_key(script, "video_(id)/page", start, {})
+
+
+def kuaishou_full(script):
+    return list(json.loads(script.split("window.INIT_STATE = ")[1]).values())[2]
+
+
+def kuaishou_subtree(script):
+    start = script.index("{", script.index("window.INIT_STATE = "))
+    return decode_nth_member(script, 2, start, {})
+
+
+def weibo_execjs(script):
+    return Weibo._eval_render_data(script).get("status", {})
+
+
+def weibo_in_process(script):
+    return Weibo._parse_render_data(script).get("status", {})
+
+
+CASES = {
+    "xiaohongshu": ("window.__INITIAL_STATE__", xiaohongshu_full, xiaohongshu_subtree),
+    "douyin": ("window._ROUTER_DATA", douyin_full, douyin_subtree),
+    "kuaishou": ("window.INIT_STATE", kuaishou_full, kuaishou_subtree),
+    "weibo": ("$render_data", weibo_execjs, weibo_in_process),
+}
+
+
+def measure(fn, script: str, rounds: int):
+    """返回中位耗时（毫秒）和内存峰值（KB）"""
+    tracemalloc.start()
+    fn(script)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(script)
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations), peak / 1024
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="比较页面状态的解码方案")
+    parser.add_argument("--rounds", type=int, default=20, help="每个方案的执行轮数 (默认: 20)")
+    parser.add_argument("--feed-size", type=int, default=800, help="示例页面状态中推荐流的条数 (默认: 800)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f"{'平台':<12}{'状态KB':>8}{'整体ms':>10}{'子树ms':>10}{'整体峰值KB':>12}{'子树峰值KB':>12}  结果一致")
+    for platform, (marker, full, subtree) in CASES.items():
+        script = find_script(build_page(platform, args.feed_size, 10), marker)
+        full_ms, full_kb = measure(full, script, args.rounds)
+        sub_ms, sub_kb = measure(subtree, script, args.rounds)
+        same = full(script) == subtree(script)
+        print(
+            f"{platform:<12}{len(script) / 1024:>8.0f}{full_ms:>10.2f}{sub_ms:>10.2f}"
+            f"{full_kb:>12.0f}{sub_kb:>12.0f}  {'是' if same else '否'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+比较 BeautifulSoup 整页解析与快速提取路径的耗时
+
+用法:
+    python benchmarks/extractor_benchmark.py
+    python benchmarks/extractor_benchmark.py --rounds 50 --feed-size 800
+    python benchmarks/extractor_benchmark.py --html xiaohongshu=saved_page.html
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from benchmarks.sample_pages import PLATFORMS, build_page
+from src.utils.extractor import find_meta, find_script, find_title
+
+# 各平台状态脚本的标识
+MARKERS = {
+    "xiaohongshu": "window.__INITIAL_STATE__",
+    "douyin": "window._ROUTER_DATA",
+    "kuaishou": "window.INIT_STATE",
+    "weibo": "$render_data",
+}
+
+
+def extract_with_soup(html: str, marker: str):
+    """原有方案：构建完整 DOM 后查找脚本和 meta"""
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.title.text if soup.title else ""
+    script_text = None
+    for script in soup.find_all("script"):
+        if script.string and marker in script.string:
+            script_text = script.string
+            break
+    meta = soup.find("meta", attrs={"name": "description"})
+    description = meta.get("content", "") if meta else ""
+    return title, script_text, description
+
+
+def extract_fast(html: str, marker: str):
+    """快速路径：直接在原始文本中定位"""
+    return find_title(html) or "", find_script(html, marker), find_meta(html, name="description") or ""
+
+
+def measure(fn, html: str, marker: str, rounds: int) -> list:
+    """执行多轮并返回每轮耗时（毫秒）"""
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(html, marker)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="比较页面状态提取方案的耗时")
+    parser.add_argument("--rounds", type=int, default=20, help="每个方案的执行轮数 (默认: 20)")
+    parser.add_argument("--feed-size", type=int, default=400, help="示例页面状态中推荐流的条数 (默认: 400)")
+    parser.add_argument("--body-size", type=int, default=600, help="示例页面主体节点数 (默认: 600)")
+    parser.add_argument(
+        "--html",
+        action="append",
+        default=[],
+        metavar="PLATFORM=FILE",
+        help="使用保存的真实页面代替示例页面，可重复指定",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    pages = {platform: build_page(platform, args.feed_size, args.body_size) for platform in PLATFORMS}
+    for item in args.html:
+        platform, path = item.split("=", 1)
+        with open(path, "r", encoding="utf-8") as f:
+            pages[platform] = f.read()
+
+    print(f"{'平台':<12}{'页面KB':>8}{'soup中位ms':>12}{'fast中位ms':>12}{'加速比':>8}  结果一致")
+    for platform, html in pages.items():
+        marker = MARKERS[platform]
+        same = extract_with_soup(html, marker) == extract_fast(html, marker)
+        soup_ms = statistics.median(measure(extract_with_soup, html, marker, args.rounds))
+        fast_ms = statistics.median(measure(extract_fast, html, marker, args.rounds))
+        print(
+            f"{platform:<12}{len(html) / 1024:>8.0f}{soup_ms:>12.2f}{fast_ms:>12.3f}"
+            f"{soup_ms / fast_ms:>8.0f}x  {'是' if same else '否'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+平台响应的录制与离线回放
+
+录制: 按真实请求逐跳记录重定向和最终页面，保存为 gzip 压缩的 JSON 夹具
+回放: 本地 HTTP 服务按原始链接返回录制的响应，ReplayTransport 把共享客户端的请求转发过去，
+      解析类无需任何改动即可离线运行
+
+用法:
+    python benchmarks/replay.py record xiaohongshu "http://xhslink.com/a/xxx" -o benchmarks/fixtures/xhs.json.gz
+    python benchmarks/replay.py show benchmarks/fixtures/xhs.json.gz
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import httpx
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+__all__ = [
+    "Exchange",
+    "Fixture",
+    "load_fixture",
+    "save_fixture",
+    "record",
+    "ReplayServer",
+    "ReplayTransport",
+]
+
+# 回放服务通过该请求头获知原始链接
+REPLAY_URL_HEADER = "X-Replay-Url"
+# 录制时保留的响应头，其余（如 Set-Cookie、Content-Encoding）不回放
+KEPT_HEADERS = ("content-type", "location")
+MAX_REDIRECTS = 10
+
+
+@dataclass
+class Exchange:
+    """一次请求与响应"""
+
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: str = ""
+
+
+@dataclass
+class Fixture:
+    """一个分享链接从首个请求到最终页面的完整响应链"""
+
+    platform: str
+    input: str
+    exchanges: List[Exchange] = field(default_factory=list)
+
+
+def save_fixture(fixture: Fixture, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(asdict(fixture), f, ensure_ascii=False)
+
+
+def load_fixture(path: str) -> Fixture:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    return Fixture(
+        platform=data["platform"],
+        input=data["input"],
+        exchanges=[Exchange(**exchange) for exchange in data["exchanges"]],
+    )
+
+
+def record(platform: str, text: str, headers: Optional[dict] = None) -> Fixture:
+    """
+    请求真实平台并逐跳录制响应
+
+    参数:
+        platform: 平台名称
+        text: 分享文本或链接
+        headers: 请求头，默认使用对应解析模块的 HEADERS
+    """
+    import importlib
+
+    from src.app.registry import get_spec
+    from src.utils import find_url
+
+    if headers is None:
+        headers = importlib.import_module(get_spec(platform).module).HEADERS
+    url = find_url(text)
+    if not url:
+        raise ValueError(f"无法从文本 '{text}' 中提取 URL")
+
+    fixture = Fixture(platform=platform, input=text)
+    with httpx.Client(headers=headers, follow_redirects=False, timeout=10.0) as client:
+        for _ in range(MAX_REDIRECTS + 1):
+            response = client.get(url)
+            fixture.exchanges.append(Exchange(
+                url=url,
+                status=response.status_code,
+                headers={k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS},
+                body="" if response.is_redirect else response.text,
+            ))
+            if not response.is_redirect:
+                return fixture
+            url = urljoin(url, response.headers["location"])
+    raise ValueError(f"重定向次数超过 {MAX_REDIRECTS}")
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        exchange = self.server.exchanges.get(self.headers.get(REPLAY_URL_HEADER, ""))
+        if exchange is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = exchange.body.encode("utf-8")
+        self.send_response(exchange.status)
+        for key, value in exchange.headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer:
+    """
+    本地回放服务
+
+    在后台线程中运行，按原始链接返回夹具中录制的响应，未录制的链接返回 404
+    """
+
+    def __init__(self, fixtures: List[Fixture], host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), _ReplayHandler)
+        self._server.daemon_threads = True
+        self._server.exchanges = {
+            exchange.url: exchange for fixture in fixtures for exchange in fixture.exchanges
+        }
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    把请求转发到本地回放服务的传输层
+
+    原始链接放在请求头中，响应仍以原始链接为 URL，重定向照常由客户端跟随
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self._transport = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        headers = dict(request.headers)
+        headers.pop("host", None)
+        headers[REPLAY_URL_HEADER] = str(request.url)
+        forwarded = httpx.Request(request.method, self.base_url + "/", headers=headers)
+        return await self._transport.handle_async_request(forwarded)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="录制或查看平台响应夹具")
+    sub = parser.add_subparsers(dest="command", required=True)
+    record_parser = sub.add_parser("record", help="请求真实平台并录制响应")
+    record_parser.add_argument("platform", help="平台名称，如 xiaohongshu")
+    record_parser.add_argument("text", help="分享文本或链接")
+    record_parser.add_argument("-o", "--output", required=True, help="夹具文件路径 (.json.gz)")
+    show_parser = sub.add_parser("show", help="查看夹具中的响应链")
+    show_parser.add_argument("path", help="夹具文件路径")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "record":
+        fixture = record(args.platform, args.text)
+        save_fixture(fixture, args.output)
+        print(f"已录制 {len(fixture.exchanges)} 个响应: {args.output}")
+    else:
+        fixture = load_fixture(args.path)
+        print(f"{fixture.platform}: {fixture.input}")
+        for exchange in fixture.exchanges:
+            print(f"  {exchange.status} {exchange.url} ({len(exchange.body)} 字符)")
+
+
+if __name__ == "__main__":
+    main()
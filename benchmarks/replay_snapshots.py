@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+用磁盘上的页面快照离线重放解析逻辑，不发起任何网络请求
+
+修改提取逻辑后，可以用它检查已缓存页面的解析结果是否仍然正确
+
+用法:
+    python benchmarks/replay_snapshots.py
+    python benchmarks/replay_snapshots.py --platform douyin --show
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.app.registry import get_parser, match_host, platforms
+from src.utils.snapshot_store import snapshot_store
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="用页面快照离线重放解析逻辑")
+    parser.add_argument("--platform", choices=platforms(), help="只重放指定平台")
+    parser.add_argument("--type", default="png", help="图片类型 (默认: png)")
+    parser.add_argument("--show", action="store_true", help="输出每条解析结果")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    snapshot_store.load()
+
+    # 同一内容只重放一次，优先使用最终链接
+    seen = set()
+    total = failed = 0
+    for url, entry in snapshot_store.entries():
+        if entry["digest"] in seen:
+            continue
+        seen.add(entry["digest"])
+        app_type = match_host(urlparse(entry["final_url"]).hostname or "")
+        if not app_type or (args.platform and app_type != args.platform):
+            continue
+
+        total += 1
+        page = snapshot_store.get(url, allow_expired=True, allow_partial=True)
+        start = time.perf_counter()
+        try:
+            parser = get_parser(app_type)(url, args.type, fetch=False)
+            parser._parse_response(page)
+            result = parser.to_dict()
+        except Exception as e:
+            result = {"code": 500, "message": str(e)}
+        elapsed = (time.perf_counter() - start) * 1000
+
+        ok = result.get("code") == 200
+        failed += 0 if ok else 1
+        print(f"{'OK ' if ok else 'ERR'} {app_type:<12}{elapsed:>8.2f}ms  {entry['final_url']}")
+        if args.show or not ok:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+
+    print(f"共重放 {total} 个页面，失败 {failed} 个")
+
+
+if __name__ == "__main__":
+    main()
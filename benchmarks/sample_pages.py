@@ -0,0 +1,157 @@
+"""
+基准测试用的各平台示例页面
+
+按真实页面的结构生成：<head> 中的 title/meta、大量 DOM 节点和脚本，
+以及体积较大的内嵌状态脚本，用于离线比较不同解析方案的开销
+"""
+
+import json
+
+__all__ = ["build_page", "PLATFORMS"]
+
+PLATFORMS = ("xiaohongshu", "douyin", "kuaishou", "weibo")
+
+
+def _filler_feed(count: int) -> list:
+    """生成与作品无关的推荐流数据，模拟状态中的大块冗余内容"""
+    return [
+        {
+            "id": f"{i:024x}",
+            "displayTitle": f"推荐内容 {i} " + "描述" * 20,
+            "user": {"nickname": f"用户{i}", "avatar": f"https://example.com/avatar/{i}.jpg"},
+            "interactInfo": {"likedCount": str(i * 7), "liked": False, "extra": None},
+            "cover": {"urlDefault": f"https://example.com/cover/{i}!nd_dft", "width": 1080, "height": 1440},
+        }
+        for i in range(count)
+    ]
+
+
+def _filler_body(count: int) -> str:
+    """生成页面主体的 DOM 节点"""
+    items = "".join(
+        f'<div class="note-item" data-index="{i}"><a href="/explore/{i:024x}">'
+        f'<img src="https://example.com/{i}.jpg" alt="cover {i}"><span class="title">标题 {i}</span>'
+        f"</a><p>内容 &amp; 描述 {i}</p></div>"
+        for i in range(count)
+    )
+    scripts = "".join(
+        f'<script>window.__track_{i}=function(){{return {i};}};</script>' for i in range(30)
+    )
+    return f'<div id="app">{items}</div>{scripts}'
+
+
+def _head(title: str, description: str) -> str:
+    links = "".join(f'<link rel="preload" href="/static/chunk-{i}.js" as="script">' for i in range(40))
+    return (
+        f'<head><meta charset="utf-8"><title>{title}</title>'
+        f'<meta name="description" content="{description}">'
+        f'<meta property="og:description" content="{description}">{links}'
+        '<style>.note-item{display:flex}</style></head>'
+    )
+
+
+def _xiaohongshu_state(feed_size: int) -> str:
+    note_id = "64f0a1b2c3d4e5f601234567"
+    state = {
+        "global": {"appSettings": {"notificationInterval": 30}},
+        "feed": {"feeds": _filler_feed(feed_size)},
+        "note": {
+            "firstNoteId": note_id,
+            "noteDetailMap": {
+                note_id: {
+                    "note": {
+                        "title": "示例笔记",
+                        "imageList": [
+                            {
+                                "urlDefault": f"http://sns-webpic-qc.xhscdn.com/202401/notes_pre_post/token{i}!nd_dft_wlteh_webp_3",
+                                "stream": {"h264": [{"masterUrl": f"http://sns-video.xhscdn.com/live/{i}.mp4"}]},
+                            }
+                            for i in range(9)
+                        ],
+                        "lastUpdateTime": "__UNDEFINED__",
+                    }
+                }
+            },
+        },
+    }
+    text = json.dumps(state, ensure_ascii=False).replace('"__UNDEFINED__"', "undefined")
+    return f"<script>window.__INITIAL_STATE__={text}</script>"
+
+
+def _douyin_state(feed_size: int) -> str:
+    state = {
+        "loaderData": {
+            "layout": {"feed": _filler_feed(feed_size)},
+            "video_(id)/page": {
+                "videoInfoRes": {
+                    "item_list": [
+                        {
+                            "desc": "示例视频",
+                            "video": {"play_addr": {"url_list": ["https://aweme.snssdk.com/aweme/v1/playwm/?video_id=v0200"]}},
+                        }
+                    ]
+                }
+            },
+        }
+    }
+    return f"<script>window._ROUTER_DATA = {json.dumps(state, ensure_ascii=False)}</script>"
+
+
+def _kuaishou_state(feed_size: int) -> str:
+    state = {
+        "tracking": {"feed": _filler_feed(feed_size // 2)},
+        "config": {"feed": _filler_feed(feed_size // 2)},
+        "photo_3xabcd": {
+            "photo": {
+                "caption": "示例快手作品",
+                "manifest": {"adaptationSet": [{"representation": [{"backupUrl": ["https://v2.kwaicdn.com/upic/example.mp4"]}]}]},
+                "ext_params": {"atlas": {"list": [f"/ufile/atlas/{i}.jpg" for i in range(6)]}},
+            }
+        },
+    }
+    return f"<script>window.INIT_STATE = {json.dumps(state, ensure_ascii=False)}</script>"
+
+
+def _weibo_state(feed_size: int) -> str:
+    render_data = [
+        {
+            "status": {
+                "text": "示例微博 <a href='/n/user'>@user</a>",
+                "pic_ids": [f"pic{i:04d}" for i in range(9)],
+                "pics": [{"type": "livephoto", "videoSrc": f"https://video.weibo.com/{i}.mov"} for i in range(2)],
+                "page_info": {"type": "video", "media_info": {"stream_url": "https://f.video.weibocdn.com/example.mp4"}},
+                "comments": _filler_feed(feed_size),
+            },
+            "call": "status",
+        }
+    ]
+    return (
+        "<script>\n    var $render_data = "
+        f"{json.dumps(render_data, ensure_ascii=False)}[0] || {{}};\n"
+        '    var __wb_config = {"uid": "1000"};\n</script>'
+    )
+
+
+_STATE_BUILDERS = {
+    "xiaohongshu": _xiaohongshu_state,
+    "douyin": _douyin_state,
+    "kuaishou": _kuaishou_state,
+    "weibo": _weibo_state,
+}
+
+
+def build_page(platform: str, feed_size: int = 400, body_size: int = 600) -> str:
+    """
+    生成指定平台的示例页面
+
+    参数:
+        platform: 平台名称
+        feed_size: 状态中冗余推荐流的条数，控制状态脚本体积
+        body_size: 页面主体节点数，控制 DOM 规模
+
+    返回:
+        页面 HTML
+    """
+    head = _head(f"{platform} 示例 - 标题 &amp; 副标题", "示例描述 &quot;引用&quot;")
+    state = _STATE_BUILDERS[platform](feed_size)
+    return f"<!DOCTYPE html><html>{head}<body>{_filler_body(body_size)}{state}</body></html>"
@@ -16,7 +16,12 @@ from .face_detector import detect_face_mtcnn
 from hivision.plugin.beauty.handler import beauty_face
 from .photo_adjuster import adjust_photo
 import cv2
-import time
+from contextlib import nullcontext
+
+
+def _null_timer(name: str):
+    """默认的阶段计时器，不做任何记录"""
+    return nullcontext()
 
 
 class IDCreator:
@@ -46,6 +51,8 @@ class IDCreator:
         self.matting_handler: ContextHandler = extract_human
         self.detection_handler: ContextHandler = detect_face_mtcnn
         self.beauty_handler: ContextHandler = beauty_face
+        # 阶段计时器，接收阶段名称并返回上下文管理器，如 with self.timer("matting"): ...
+        self.timer = _null_timer
         # 上下文
         self.ctx = None
 
@@ -102,9 +109,6 @@ class IDCreator:
         )
 
 
-        # 总的开始时间
-        total_start_time = time.time()
-        
         self.ctx = Context(params)
         ctx = self.ctx
         ctx.processing_image = image
@@ -118,11 +122,8 @@ class IDCreator:
         # 如果仅裁剪，则不进行抠图
         if not ctx.params.crop_only:
             # 调用抠图工作流
-            print("[1]  Start Human Matting...")
-            start_matting_time = time.time()
-            self.matting_handler(ctx)
-            end_matting_time = time.time()
-            print(f"[1]  Human Matting Time: {end_matting_time - start_matting_time:.3f}s")
+            with self.timer("matting"):
+                self.matting_handler(ctx)
             self.after_matting and self.after_matting(ctx)
         # 如果进行抠图
         else:
@@ -130,11 +131,8 @@ class IDCreator:
 
 
         # 2. ------------------美颜------------------
-        print("[2]  Start Beauty...")
-        start_beauty_time = time.time()
-        self.beauty_handler(ctx)
-        end_beauty_time = time.time()
-        print(f"[2]  Beauty Time: {end_beauty_time - start_beauty_time:.3f}s")
+        with self.timer("beauty"):
+            self.beauty_handler(ctx)
 
         # 如果仅换底，则直接返回抠图结果
         if ctx.params.change_bg_only:
@@ -150,41 +148,32 @@ class IDCreator:
             return ctx.result
 
         # 3. ------------------人脸检测------------------
-        print("[3]  Start Face Detection...")
-        start_detection_time = time.time()
-        self.detection_handler(ctx)
-        end_detection_time = time.time()
-        print(f"[3]  Face Detection Time: {end_detection_time - start_detection_time:.3f}s")
+        with self.timer("detection"):
+            self.detection_handler(ctx)
         self.after_detect and self.after_detect(ctx)
 
         # 3.1 ------------------人脸对齐------------------
         if ctx.params.face_alignment and abs(ctx.face["roll_angle"]) > 2:
-            print("[3.1]  Start Face Alignment...")
-            start_alignment_time = time.time()
             from hivision.creator.rotation_adjust import rotate_bound_4channels
 
-            # 根据角度旋转原图和抠图
-            b, g, r, a = cv2.split(ctx.matting_image)
-            ctx.origin_image, ctx.matting_image, _, _, _, _ = rotate_bound_4channels(
-                cv2.merge((b, g, r)),
-                a,
-                -1 * ctx.face["roll_angle"],
-            )
-
-            # 旋转后再执行一遍人脸检测
-            self.detection_handler(ctx)
+            with self.timer("alignment"):
+                # 根据角度旋转原图和抠图
+                b, g, r, a = cv2.split(ctx.matting_image)
+                ctx.origin_image, ctx.matting_image, _, _, _, _ = rotate_bound_4channels(
+                    cv2.merge((b, g, r)),
+                    a,
+                    -1 * ctx.face["roll_angle"],
+                )
+
+                # 旋转后再执行一遍人脸检测
+                self.detection_handler(ctx)
             self.after_detect and self.after_detect(ctx)
-            end_alignment_time = time.time()
-            print(f"[3.1]  Face Alignment Time: {end_alignment_time - start_alignment_time:.3f}s")
 
         # 4. ------------------图像调整------------------
-        print("[4]  Start Image Post-Adjustment...")
-        start_adjust_time = time.time()
-        result_image_hd, result_image_standard, clothing_params, typography_params = (
-            adjust_photo(ctx)
-        )
-        end_adjust_time = time.time()
-        print(f"[4]  Image Post-Adjustment Time: {end_adjust_time - start_adjust_time:.3f}s")
+        with self.timer("adjust"):
+            result_image_hd, result_image_standard, clothing_params, typography_params = (
+                adjust_photo(ctx)
+            )
 
         # 5. ------------------返回结果------------------
         ctx.result = Result(
@@ -197,8 +186,4 @@ class IDCreator:
         )
         self.after_all and self.after_all(ctx)
 
-        # 总的结束时间
-        total_end_time = time.time()
-        print(f"[Total]  Total Time: {total_end_time - total_start_time:.3f}s")
-
         return ctx.result
@@ -1,5 +1,5 @@
 from typing import Optional
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from pydantic import BaseModel
 import uvicorn
 import os
@@ -16,6 +16,13 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # 导入配置和日志模块
 from src.utils import get_app_logger, config, get_environment, EnvType
+from src.utils.http_client import init_http_client, close_http_client
+from src.utils.short_link import short_link_cache
+from src.utils.snapshot_store import snapshot_store
+from src.utils.media_cache import media_cache
+from src.utils.timing import TimingMiddleware
+from src.utils.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
+from src.utils.codec import CodecMiddleware, CodecResponse
 
 # 获取应用日志器
 logger = get_app_logger()
@@ -31,6 +38,7 @@ app = FastAPI(
     version=config.API_VERSION,
     debug=config.DEBUG,
     openapi_version="3.0.2",  # 设置OpenAPI版本
+    default_response_class=CodecResponse,  # orjson 编码，按 Accept 协商 msgpack
     # 添加路由分组的标签描述
     openapi_tags=[
         {
@@ -60,15 +68,37 @@ app = FastAPI(
     ]
 )
 
+# 各阶段耗时写入 Server-Timing 响应头
+app.add_middleware(TimingMiddleware)
+# 正在处理的请求数和按路由区分的请求耗时
+app.add_middleware(MetricsMiddleware)
+# 根据 Accept 头选择响应编码
+app.add_middleware(CodecMiddleware)
+
 # 应用启动和关闭事件
 @app.on_event("startup")
 async def startup_event():
     """应用启动时的事件处理"""
     logger.info(f"API 服务启动 - 环境: {current_env}")
+    # 创建进程级共享的 HTTP 连接池
+    init_http_client()
+    # 加载持久化的短链缓存
+    short_link_cache.load()
+    # 加载页面快照索引
+    snapshot_store.load()
+    # 扫描媒体缓存目录重建索引
+    media_cache.load()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭时的事件处理"""
+    # 停止异步解析任务的 worker
+    from src.routes.analyze import job_service
+    await job_service.stop()
+    # 释放共享的 HTTP 连接池
+    await close_http_client()
+    short_link_cache.save()
+    snapshot_store.save()
     logger.info("API 服务关闭")
 
 # Root endpoint
@@ -89,6 +119,12 @@ async def health_check():
     """健康检查端点"""
     logger.info("执行健康检查123131")
     return {"status": "健康", "环境": current_env}
+
+# Prometheus 指标
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """以 Prometheus 文本格式返回进程内指标"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
     
 # 注册所有路由模块
 from src.routes import db_register_routes
@@ -1,9 +1,23 @@
 # src 包初始化
-from .app.xiaohongshu.index import Xiaohongshu
-from .app.douyin.index import Douyin
-from .app.xiaohongshu.image import Image
-from .app.kuaishou.index import Kuaishou
-from .app.test.index import Test
-from .app.weibo.index import Weibo
-
-__all__ = ["Xiaohongshu", "Image", "Douyin", "Kuaishou", "Test", "Weibo"]
\ No newline at end of file
+# 解析类按需导入，避免启动时加载所有平台模块及 selenium
+import importlib
+
+_EXPORTS = {
+    "Xiaohongshu": "src.app.xiaohongshu.index",
+    "Image": "src.app.xiaohongshu.image",
+    "Douyin": "src.app.douyin.index",
+    "Kuaishou": "src.app.kuaishou.index",
+    "Test": "src.app.test.index",
+    "Weibo": "src.app.weibo.index",
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["Xiaohongshu", "Image", "Douyin", "Kuaishou", "Test", "Weibo"]
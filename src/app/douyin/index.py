@@ -1,45 +1,94 @@
 import json
-from bs4 import BeautifulSoup
 import httpx
 from src.utils import get_analyze_logger, config
+from src.utils.snapshot_store import fetch_page, snapshot_ttl
 from src.utils.index import find_url
 from src.utils.response import Response
+from src.utils.extractor import PageExtractor, state_ready
+from src.utils.json_subtree import decode_key
+from src.utils.timing import phase
 
 
 logger = get_analyze_logger()
 
 
+# 请求头
+HEADERS = {
+    "User-Agent": config.MOBILE_USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Referer": "https://www.google.com/",
+}
+
+# 内嵌状态脚本的标识
+STATE_MARKER = "window._ROUTER_DATA"
+
+
 class Douyin:
-    def __init__(self, text, type):
+    def __init__(self, text, type, fetch=True):
         self.text = text
         self.type = type
         self.url = find_url(text)
         self.description = ""
         self.image_list = []
         self.video = ""
+        self.html = ""
+        self.final_url = None
+        self.title = ""
         if not self.url:
             error_msg = f"无法从文本 '{text}' 中提取 URL"
             raise ValueError(error_msg)
-        try:
-            headers = {
-                "User-Agent": config.MOBILE_USER_AGENT,
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-                "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
-                "Referer": "https://www.google.com/",
-            }
-            response = httpx.get(
-                self.url, follow_redirects=True, headers=headers, timeout=10.0
-            )
-            self.html = response.text
-            self.soup = BeautifulSoup(self.html, "html.parser")
-            # 提取页面标题
-            self.title = self.soup.title.text if self.soup.title else ""
+        if fetch:
+            try:
+                response = httpx.get(
+                    self.url, follow_redirects=True, headers=HEADERS, timeout=10.0
+                )
+                self._parse_response(response)
+            except Exception as e:
+                logger.error(f"获取抖音内容失败: {e}")
+                raise e
 
-            # 提取页面内容
-            self.extract_douyin_data()
+    @classmethod
+    async def create(cls, text, type, early_stop=True, extract=True):
+        """
+        异步构建：优先使用未过期的页面快照，否则通过共享的 AsyncClient 获取页面，不阻塞事件循环
+
+        early_stop 为 True 时读到内嵌状态脚本即停止下载，需要完整 HTML 时传 False；
+        extract 为 False 时只获取页面，不提取作品数据（页面中没有数据时也不报错）
+        """
+        douyin = cls(text, type, fetch=False)
+        try:
+            with phase("fetch"):
+                response = await fetch_page(
+                    douyin.url,
+                    headers=HEADERS,
+                    until=state_ready(STATE_MARKER) if early_stop else None,
+                    ttl=snapshot_ttl("douyin"),
+                )
+            douyin._parse_response(response, extract)
         except Exception as e:
             logger.error(f"获取抖音内容失败: {e}")
             raise e
+        return douyin
+
+    def _parse_response(self, response, extract=True):
+        """解析页面响应，extract 为 False 时只保存页面，不提取作品数据"""
+        self.final_url = response.url
+        self.html = response.text
+        # 直接在原始文本中定位所需信息，必要时才退回 BeautifulSoup
+        with phase("parse"):
+            self.page = PageExtractor(self.html)
+            # 提取页面标题
+            self.title = self.page.title()
+            if extract:
+                # 定位内嵌状态脚本（结果由 PageExtractor 缓存），提取阶段直接使用
+                self.page.script(STATE_MARKER)
+
+        if not extract:
+            return
+        # 提取页面内容
+        with phase("extract"):
+            self.extract_douyin_data()
 
     def extract_douyin_data(self):
         """提取抖音内容"""
@@ -47,19 +96,25 @@ class Douyin:
             # 提取页面内容
             self.image_data = {}
             self.video_data = {}
-            scripts = self.soup.find_all("script")
-            for script in scripts:
-                if script.string and "window._ROUTER_DATA" in script.string:
-                    data_text = script.string.split("window._ROUTER_DATA = ")[1]
-                    # 判断有没有note_(id)/page, 没有的话取video_(id)/page
-                    loaderData = json.loads(data_text).get("loaderData", {})
-                    if "note_(id)" in data_text:
-                        data_dict = loaderData.get("note_(id)/page", {})
-                    else:
-                        data_dict = loaderData.get("video_(id)/page", {})
-
-                    self.get_dict_data(data_dict)
-                    break
+            script = self.page.script(STATE_MARKER)
+            if script:
+                # 判断有没有note_(id)/page, 没有的话取video_(id)/page
+                page_key = "note_(id)/page" if "note_(id)" in script else "video_(id)/page"
+                start = script.index("{", script.index("window._ROUTER_DATA = "))
+                with phase("decode"):
+                    try:
+                        # 只解码 loaderData 中对应页面的子树
+                        data_dict = decode_key(script, page_key, start)
+                    except ValueError as e:
+                        # 无法直接定位（如键名重复）时整体解码
+                        logger.debug(f"抖音页面数据无法直接定位，改为整体解码: {e}")
+                        data_text = script.split("window._ROUTER_DATA = ")[1]
+                        loaderData = json.loads(data_text).get("loaderData", {})
+                        data_dict = loaderData.get(page_key, {})
+
+                self.get_dict_data(data_dict)
+            else:
+                raise ValueError(f"抖音页面中没有作品数据（可能是验证码、登录页或页面结构变化）: {self.final_url}")
         except Exception as e:
             raise e
 
@@ -1,16 +1,31 @@
 import json
-from bs4 import BeautifulSoup
 import httpx
 from src.utils import get_analyze_logger, config
+from src.utils.snapshot_store import fetch_page, snapshot_ttl
 from src.utils.index import find_url
 from src.utils.response import Response
+from src.utils.extractor import PageExtractor, state_ready
+from src.utils.json_subtree import decode_nth_member
+from src.utils.timing import phase
 
 
 logger = get_analyze_logger()
 
 
+# 请求头
+HEADERS = {
+    "User-Agent": config.MOBILE_USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Referer": "https://www.google.com/",
+}
+
+# 内嵌状态脚本的标识
+STATE_MARKER = "window.INIT_STATE"
+
+
 class Kuaishou:
-    def __init__(self, text, type):
+    def __init__(self, text, type, fetch=True):
         self.text = text
         self.type = type
         self.url = find_url(text)
@@ -18,30 +33,64 @@ class Kuaishou:
         self.video = ""
         self.image_list = []
         self.image_prefix = "https://tx2.a.kwimgs.com/"
+        self.html = ""
+        self.final_url = None
+        self.title = ""
         if not self.url:
             error_msg = f"无法从文本 '{text}' 中提取 URL"
             logger.error(error_msg)
             raise ValueError(error_msg)
-        try:
-            headers = {
-                "User-Agent": config.MOBILE_USER_AGENT,
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-                "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
-                "Referer": "https://www.google.com/",
-            }
-            response = httpx.get(
-                self.url, follow_redirects=True, headers=headers, timeout=10.0
-            )
-            self.html = response.text
-            self.soup = BeautifulSoup(self.html, "html.parser")
-            # 提取页面标题
-            self.title = self.soup.title.text if self.soup.title else ""
+        if fetch:
+            try:
+                response = httpx.get(
+                    self.url, follow_redirects=True, headers=HEADERS, timeout=10.0
+                )
+                self._parse_response(response)
+            except Exception as e:
+                logger.error(f"获取快手内容失败: {e}")
+                raise e
 
-            # 提取页面内容
-            self.extract_kuaishou_data()
+    @classmethod
+    async def create(cls, text, type, early_stop=True, extract=True):
+        """
+        异步构建：优先使用未过期的页面快照，否则通过共享的 AsyncClient 获取页面，不阻塞事件循环
+
+        early_stop 为 True 时读到内嵌状态脚本即停止下载，需要完整 HTML 时传 False；
+        extract 为 False 时只获取页面，不提取作品数据（页面中没有数据时也不报错）
+        """
+        kuaishou = cls(text, type, fetch=False)
+        try:
+            with phase("fetch"):
+                response = await fetch_page(
+                    kuaishou.url,
+                    headers=HEADERS,
+                    until=state_ready(STATE_MARKER) if early_stop else None,
+                    ttl=snapshot_ttl("kuaishou"),
+                )
+            kuaishou._parse_response(response, extract)
         except Exception as e:
             logger.error(f"获取快手内容失败: {e}")
             raise e
+        return kuaishou
+
+    def _parse_response(self, response, extract=True):
+        """解析页面响应，extract 为 False 时只保存页面，不提取作品数据"""
+        self.final_url = response.url
+        self.html = response.text
+        # 直接在原始文本中定位所需信息，必要时才退回 BeautifulSoup
+        with phase("parse"):
+            self.page = PageExtractor(self.html)
+            # 提取页面标题
+            self.title = self.page.title()
+            if extract:
+                # 定位内嵌状态脚本（结果由 PageExtractor 缓存），提取阶段直接使用
+                self.page.script(STATE_MARKER)
+
+        if not extract:
+            return
+        # 提取页面内容
+        with phase("extract"):
+            self.extract_kuaishou_data()
 
     def extract_kuaishou_data(self):
         """提取快手内容"""
@@ -49,18 +98,26 @@ class Kuaishou:
             # 提取页面内容
             self.image_data = {}
             self.video_data = {}
-            scripts = self.soup.find_all("script")
-            
             # 初始化data_dict为空字典，确保即使没找到数据也有这个属性
             self.data_dict = {}
             
-            for script in scripts:
-                if script.string and "window.INIT_STATE" in script.string:
-                    data_text = script.string.split("window.INIT_STATE = ")[1]
-                    # 提取出来的数据转成dict
-                    data_dict = json.loads(data_text)
-                    self.data_dict = data_dict
-                    break
+            script = self.page.script(STATE_MARKER)
+            if script:
+                start = script.index("{", script.index("window.INIT_STATE = "))
+                # 作品数据在第三个成员中，只解码到该成员为止
+                with phase("decode"):
+                    try:
+                        self.data_dict = decode_nth_member(script, 2, start)
+                    except ValueError as e:
+                        # 无法直接定位时整体解码
+                        logger.debug(f"快手页面数据无法直接定位，改为整体解码: {e}")
+                        data_text = script.split("window.INIT_STATE = ")[1]
+                        data_list = list(json.loads(data_text).values())
+                        if len(data_list) <= 2:
+                            raise ValueError(f"快手页面数据不完整: {self.final_url}")
+                        self.data_dict = data_list[2]
+            else:
+                raise ValueError(f"快手页面中没有作品数据（可能是验证码、登录页或页面结构变化）: {self.final_url}")
             
             # 如果data_dict为空，记录日志
             if not self.data_dict:
@@ -78,12 +135,7 @@ class Kuaishou:
                 logger.warning("data_dict为空，无法提取数据")
                 return
             
-            data_list = list(self.data_dict.values())
-            if not data_list or len(data_list) <= 2:
-                logger.warning("data_dict不包含足够的数据")
-                return
-            
-            obj1_data = data_list[2] if len(data_list) > 2 else {}
+            obj1_data = self.data_dict
             obj2_data = obj1_data.get("photo", {})
             obj3_data = obj2_data.get("manifest", {})
             obj4_data = obj2_data.get("ext_params", {})
@@ -0,0 +1,206 @@
+import importlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Pattern, Tuple
+from urllib.parse import urlparse
+
+from src.utils import find_url, find_urls
+
+__all__ = [
+    "PlatformSpec",
+    "register",
+    "get_spec",
+    "get_parser",
+    "platforms",
+    "match_host",
+    "match_media_host",
+    "match_domain",
+    "detect_platform",
+    "find_supported_urls",
+    "extract_post_id",
+]
+
+
+@dataclass(frozen=True)
+class PlatformSpec:
+    """
+    平台解析器的注册信息
+
+    只记录模块路径和类名，解析器模块在第一次使用时才导入
+    """
+
+    name: str
+    module: str
+    class_name: str
+    # 平台域名，子域名同样匹配，如 xiaohongshu.com 匹配 www.xiaohongshu.com
+    hosts: Tuple[str, ...]
+    # 从链接中提取作品 ID 的规则
+    post_id_patterns: Tuple[Pattern, ...] = field(default_factory=tuple)
+    # 图片、视频 CDN 域名，媒体代理按此选择请求头
+    media_hosts: Tuple[str, ...] = ()
+    # 请求 CDN 资源时携带的 Referer，部分 CDN 会校验防盗链
+    referer: str = ""
+
+
+_SPECS: Dict[str, PlatformSpec] = {}
+_HOSTS: Dict[str, str] = {}
+_MEDIA_HOSTS: Dict[str, str] = {}
+_PARSERS: Dict[str, type] = {}
+
+
+def register(spec: PlatformSpec):
+    """注册平台，域名重复注册时抛出 ValueError"""
+    for table, hosts in ((_HOSTS, spec.hosts), (_MEDIA_HOSTS, spec.media_hosts)):
+        for host in hosts:
+            owner = table.get(host)
+            if owner and owner != spec.name:
+                raise ValueError(f"域名 {host} 已注册到平台 {owner}")
+    _SPECS[spec.name] = spec
+    for host in spec.hosts:
+        _HOSTS[host] = spec.name
+    for host in spec.media_hosts:
+        _MEDIA_HOSTS[host] = spec.name
+
+
+def get_spec(name: str) -> PlatformSpec:
+    """获取平台注册信息，未注册时抛出 KeyError"""
+    return _SPECS[name]
+
+
+def get_parser(name: str) -> type:
+    """获取平台解析类，首次调用时导入对应模块"""
+    parser = _PARSERS.get(name)
+    if parser is None:
+        spec = _SPECS[name]
+        parser = getattr(importlib.import_module(spec.module), spec.class_name)
+        _PARSERS[name] = parser
+    return parser
+
+
+def platforms() -> List[str]:
+    """已注册的平台名称"""
+    return list(_SPECS)
+
+
+def _lookup_domain(table: Dict[str, str], host: str) -> Optional[str]:
+    """返回 host 匹配到的已注册域名"""
+    host = host.lower().rstrip(".")
+    while host:
+        if host in table:
+            return host
+        _, _, host = host.partition(".")
+    return None
+
+
+def _lookup_host(table: Dict[str, str], host: str) -> Optional[str]:
+    domain = _lookup_domain(table, host)
+    return table[domain] if domain else None
+
+
+def match_host(host: str) -> Optional[str]:
+    """
+    按域名查找平台
+
+    从完整域名开始逐级去掉最左侧的标签做字典查找，
+    如 www.xiaohongshu.com -> xiaohongshu.com -> com
+    """
+    return _lookup_host(_HOSTS, host)
+
+
+def match_media_host(host: str) -> Optional[str]:
+    """按图片、视频 CDN 域名查找平台，规则与 match_host 相同，未匹配时再按平台域名查找"""
+    return _lookup_host(_MEDIA_HOSTS, host) or _lookup_host(_HOSTS, host)
+
+
+def match_domain(host: str) -> Optional[str]:
+    """
+    返回主机所属的已注册平台域名（页面域名或 CDN 域名），如 www.xiaohongshu.com -> xiaohongshu.com
+
+    用于按域名聚合的状态（限流熔断、并发限制、指标标签），未注册的主机返回 None
+    """
+    return _lookup_domain(_HOSTS, host) or _lookup_domain(_MEDIA_HOSTS, host)
+
+
+def detect_platform(text: str) -> Optional[str]:
+    """从分享文本中的链接判断平台，没有链接或域名未注册时返回 None"""
+    url = find_url(text)
+    if not url:
+        return None
+    host = urlparse(url).hostname
+    return match_host(host) if host else None
+
+
+def find_supported_urls(text: str) -> List[Tuple[str, str]]:
+    """提取文本中所有已注册平台的链接，返回 (平台, 链接) 列表，保持出现顺序"""
+    found = []
+    for url in find_urls(text):
+        host = urlparse(url).hostname
+        name = match_host(host) if host else None
+        if name:
+            found.append((name, url))
+    return found
+
+
+def extract_post_id(name: str, url: str) -> Optional[str]:
+    """从链接中提取作品 ID，无法识别时返回 None"""
+    spec = _SPECS.get(name)
+    if spec is None:
+        return None
+    for pattern in spec.post_id_patterns:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return None
+
+
+register(PlatformSpec(
+    name="xiaohongshu",
+    module="src.app.xiaohongshu.index",
+    class_name="Xiaohongshu",
+    hosts=("xiaohongshu.com", "xhslink.com"),
+    post_id_patterns=(
+        re.compile(r"/(?:explore|discovery/item|item)/([0-9a-zA-Z]{24})"),
+    ),
+    media_hosts=("xhscdn.com", "xhscdn.net"),
+    referer="https://www.xiaohongshu.com/",
+))
+
+register(PlatformSpec(
+    name="douyin",
+    module="src.app.douyin.index",
+    class_name="Douyin",
+    hosts=("douyin.com", "iesdouyin.com"),
+    post_id_patterns=(
+        re.compile(r"/(?:video|note|slides)/(\d+)"),
+        re.compile(r"[?&]modal_id=(\d+)"),
+    ),
+    media_hosts=("douyinpic.com", "douyinvod.com", "douyincdn.com", "byteimg.com", "snssdk.com"),
+    referer="https://www.douyin.com/",
+))
+
+register(PlatformSpec(
+    name="kuaishou",
+    module="src.app.kuaishou.index",
+    class_name="Kuaishou",
+    hosts=("kuaishou.com", "gifshow.com", "chenzhongtech.com"),
+    post_id_patterns=(
+        re.compile(r"/(?:short-video|fw/photo|photo)/([\w-]+)"),
+        re.compile(r"[?&]photoId=([\w-]+)"),
+    ),
+    media_hosts=("yximgs.com", "kwimgs.com", "kwaicdn.com", "kuaishoucdn.com"),
+    referer="https://www.kuaishou.com/",
+))
+
+register(PlatformSpec(
+    name="weibo",
+    module="src.app.weibo.index",
+    class_name="Weibo",
+    # t.cn 为微博分享使用的短链域名
+    hosts=("weibo.com", "weibo.cn", "t.cn"),
+    post_id_patterns=(
+        re.compile(r"/(?:status|detail)/(\w+)"),
+        re.compile(r"weibo\.(?:com|cn)/\d+/(\w+)"),
+    ),
+    media_hosts=("sinaimg.cn", "weibocdn.com"),
+    referer="https://weibo.com/",
+))
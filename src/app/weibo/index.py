@@ -1,29 +1,42 @@
-from bs4 import BeautifulSoup
-import execjs
 import httpx
-from seleniumwire import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
+from typing import TYPE_CHECKING
 from src.utils import config, get_analyze_logger
-from seleniumwire.request import (
-    Request as SeleniumRequest,
-    Response as SeleniumResponse,
-)
+from src.utils.snapshot_store import fetch_page, snapshot_ttl
 from src.utils.response import Response
+from src.utils.extractor import PageExtractor, state_ready
+from src.utils.json_subtree import decode_value
+from src.utils.timing import phase
 import gzip
 import json
 
+if TYPE_CHECKING:
+    from seleniumwire.request import (
+        Request as SeleniumRequest,
+        Response as SeleniumResponse,
+    )
+
 logger = get_analyze_logger()
 
 
+# 请求头
+HEADERS = {
+    "User-Agent": config.MOBILE_USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Referer": "https://www.google.com/",
+}
+
+# 内嵌状态脚本的标识
+STATE_MARKER = "$render_data"
+
+
 class Weibo:
-    def __init__(self, url, type):
+    def __init__(self, url, type, fetch=True):
         self.url = url
         self.type = type
         self.html = ""
-        self.soup = ""
+        self.final_url = None
+        self.page = None
         self.image_list = []
         self.live_list = []
         self.body = {}
@@ -32,54 +45,116 @@ class Weibo:
         self.video = ""
         self.app_type = "weibo"
         # self._init_driver()
-        self._init_request()
+        if fetch:
+            self._init_request()
+
+    @classmethod
+    async def create(cls, url, type, early_stop=True, extract=True):
+        """
+        异步构建：优先使用未过期的页面快照，否则通过共享的 AsyncClient 获取页面，不阻塞事件循环
+
+        early_stop 为 True 时读到内嵌状态脚本即停止下载，需要完整 HTML 时传 False；
+        extract 为 False 时只获取页面，不提取作品数据（页面中没有数据时也不报错）
+        """
+        weibo = cls(url, type, fetch=False)
+        try:
+            with phase("fetch"):
+                response = await fetch_page(
+                    weibo.url,
+                    headers=HEADERS,
+                    until=state_ready(STATE_MARKER) if early_stop else None,
+                    ttl=snapshot_ttl("weibo"),
+                )
+            weibo._parse_response(response, extract)
+        except Exception as e:
+            logger.error(f"获取微博内容失败: {e}")
+            raise e
+        return weibo
 
     # request方案
     def _init_request(self):
         try:
-            headers = {
-                "User-Agent": config.MOBILE_USER_AGENT,
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-                "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
-                "Referer": "https://www.google.com/",
-            }
             response = httpx.get(
-                self.url, follow_redirects=True, headers=headers, timeout=10.0
+                self.url, follow_redirects=True, headers=HEADERS, timeout=10.0
             )
-            self.html = response.text
-            self.soup = BeautifulSoup(self.html, "html.parser")
-
-            # 提取页面内容
-            self.extract_weibo_data()
+            self._parse_response(response)
         except Exception as e:
             logger.error(f"获取微博内容失败: {e}")
             raise e
 
+    def _parse_response(self, response, extract=True):
+        """解析页面响应，extract 为 False 时只保存页面，不提取作品数据"""
+        self.final_url = response.url
+        self.html = response.text
+        # 直接在原始文本中定位所需信息，必要时才退回 BeautifulSoup
+        with phase("parse"):
+            self.page = PageExtractor(self.html)
+            if extract:
+                # 定位内嵌状态脚本（结果由 PageExtractor 缓存），提取阶段直接使用
+                self.page.script(STATE_MARKER)
+
+        if not extract:
+            return
+        # 提取页面内容
+        with phase("extract"):
+            self.extract_weibo_data()
+
     def extract_weibo_data(self):
-        scripts = self.soup.find_all("script")
-        for script in scripts:
-            if script.string and "$render_data" in script.string:
-                # 获取script标签里面 $render_data 的值
-                js_code = f"""
-                {script.string}
-                function get_render_data() {{
-                    return $render_data;
-                }}
-                """
-                # 执行js代码
-                ctx = execjs.compile(js_code)
-                # 双引号的数据需要转换为单引号
-                render_data = ctx.call("get_render_data")
-                self.body = render_data.get("status", {})
-                self.get_image_list()
-                self.get_live_list()
-                self.get_video()
-                self.get_title()
-                self.get_description()
-                break
+        script = self.page.script(STATE_MARKER)
+        if script:
+            with phase("decode"):
+                try:
+                    render_data = self._parse_render_data(script)
+                except ValueError as e:
+                    logger.warning(f"进程内解析 $render_data 失败，改用 execjs 执行: {e}")
+                    render_data = self._eval_render_data(script)
+            self.body = render_data.get("status", {})
+            self.get_image_list()
+            self.get_live_list()
+            self.get_video()
+            self.get_title()
+            self.get_description()
+        else:
+            raise ValueError(f"微博页面中没有作品数据（可能是验证码、登录页或页面结构变化）: {self.final_url}")
+
+    @staticmethod
+    def _parse_render_data(script):
+        """在进程内解析 $render_data = [...][0] || {} 对象字面量"""
+        start = script.index("=", script.index("$render_data")) + 1
+        while script[start].isspace():
+            start += 1
+        render_data = decode_value(script, start)
+        # 对应 [...][0] || {}
+        if isinstance(render_data, list):
+            render_data = render_data[0] if render_data else {}
+        return render_data or {}
+
+    @staticmethod
+    def _eval_render_data(script):
+        """使用 JS 运行时执行脚本获取 $render_data，每次调用都会启动外部进程"""
+        import execjs
+
+        # 获取script标签里面 $render_data 的值
+        js_code = f"""
+        {script}
+        function get_render_data() {{
+            return $render_data;
+        }}
+        """
+        # 执行js代码
+        ctx = execjs.compile(js_code)
+        # 双引号的数据需要转换为单引号
+        return ctx.call("get_render_data")
 
     # 无头浏览器方案
     def _init_driver(self):
+        # selenium 只在无头浏览器方案中使用，按需导入
+        from seleniumwire import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.common.by import By
+
         chrome_options = Options()
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
@@ -118,13 +193,13 @@ class Weibo:
             EC.presence_of_element_located((By.CLASS_NAME, "woo-box-flex"))
         )
 
-    def on_request(self, request: SeleniumRequest):
+    def on_request(self, request: "SeleniumRequest"):
         if "statuses/show" in request.url:
             import time
 
             time.sleep(2)
 
-    def on_response(self, request: SeleniumRequest, response: SeleniumResponse):
+    def on_response(self, request: "SeleniumRequest", response: "SeleniumResponse"):
         if "statuses/show" in request.url:
             body_str = gzip.decompress(response.body)
             logger.info(body_str, "body_str")
@@ -1,15 +1,30 @@
 from src.app.xiaohongshu.image import Image
 from src.utils import find_url, get_analyze_logger, config, Response
+from src.utils.snapshot_store import fetch_page, snapshot_ttl
 import re
 import httpx
-from bs4 import BeautifulSoup
+from src.utils.errors import LinkUnavailableError
+from src.utils.extractor import PageExtractor, state_ready
+from src.utils.json_subtree import decode_key
+from src.utils.timing import phase
 import json
 
 # 获取小红书模块的日志器
 logger = get_analyze_logger()
 
+# 请求头
+HEADERS = {
+    "User-Agent": config.DEFAULT_USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Referer": "https://www.google.com/",
+}
+
+# 内嵌状态脚本的标识
+STATE_MARKER = "window.__INITIAL_STATE__"
+
 class Xiaohongshu:
-    def __init__(self, text, type):
+    def __init__(self, text, type, fetch=True):
         try:
             self.text = text
             self.url = find_url(text)
@@ -20,7 +35,7 @@ class Xiaohongshu:
             self.description = ""
             self.final_url = None
             self.html = ""
-            self.soup = None
+            self.page = None
             self.title = ""
             self.data = {}
             self.app_type_keyword = config.APP_TYPE_KEYWORD.get("xiaohongshu")
@@ -28,65 +43,98 @@ class Xiaohongshu:
                 error_msg = f"无法从文本 '{text}' 中提取 URL"
                 raise ValueError(error_msg)
 
-            # 获取重定向 URL
-            headers = {
-                "User-Agent": config.DEFAULT_USER_AGENT,
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-                "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
-                "Referer": "https://www.google.com/",
-            }
-
-            response = httpx.get(
-                self.url, follow_redirects=True, headers=headers, timeout=10.0
-            )
-            self.final_url = response.url
-            if "404" in str(self.final_url):
-                # 抛出异常
-                raise ValueError(f"小红书链接已失效: {self.final_url}")
-            self.html = response.text
-            # 使用 BeautifulSoup 解析 HTML
-            self.soup = BeautifulSoup(self.html, "html.parser")
-            # 提取页面标题
-            self.title = self.soup.title.text if self.soup.title else ""
-            # 尝试提取小红书数据（示例）
-            self.extract_xiaohongshu_data()
+            if fetch:
+                # 获取重定向 URL
+                response = httpx.get(
+                    self.url, follow_redirects=True, headers=HEADERS, timeout=10.0
+                )
+                self._parse_response(response)
             
         except Exception as e:
             logger.error(f"Xiaohongshu 初始化错误: {str(e)}", exc_info=True)
             raise e
             # 设置一些默认值，避免后续处理出错
 
+    @classmethod
+    async def create(cls, text, type, early_stop=True, extract=True):
+        """
+        异步构建：优先使用未过期的页面快照，否则通过共享的 AsyncClient 获取页面，不阻塞事件循环
+
+        early_stop 为 True 时读到内嵌状态脚本即停止下载，需要完整 HTML 时传 False；
+        extract 为 False 时只获取页面，不提取作品数据（页面中没有数据时也不报错）
+        """
+        xiaohongshu = cls(text, type, fetch=False)
+        try:
+            with phase("fetch"):
+                response = await fetch_page(
+                    xiaohongshu.url,
+                    headers=HEADERS,
+                    until=state_ready(STATE_MARKER) if early_stop else None,
+                    ttl=snapshot_ttl("xiaohongshu"),
+                )
+            xiaohongshu._parse_response(response, extract)
+        except Exception as e:
+            logger.error(f"Xiaohongshu 初始化错误: {str(e)}", exc_info=True)
+            raise e
+        return xiaohongshu
+
+    def _parse_response(self, response, extract=True):
+        """解析页面响应，extract 为 False 时只保存页面，不提取作品数据"""
+        self.final_url = response.url
+        if "404" in str(self.final_url):
+            # 抛出异常
+            raise LinkUnavailableError(f"小红书链接已失效: {self.final_url}", str(self.final_url))
+        self.html = response.text
+        # 直接在原始文本中定位所需信息，必要时才退回 BeautifulSoup
+        with phase("parse"):
+            self.page = PageExtractor(self.html)
+            # 提取页面标题
+            self.title = self.page.title()
+            if extract:
+                # 定位内嵌状态脚本（结果由 PageExtractor 缓存），提取阶段直接使用
+                self.page.script(STATE_MARKER)
+        if not extract:
+            return
+        # 尝试提取小红书数据（示例）
+        with phase("extract"):
+            self.extract_xiaohongshu_data()
+
     def extract_xiaohongshu_data(self):
         """尝试从 HTML 中提取小红书数据"""
         self.data = {}
-        # 尝试查找包含 JSON 数据的脚本标签
-        scripts = self.soup.find_all("script")
-        for script in scripts:
-            # 查找可能包含数据的脚本内容
-            if script.string and "window.__INITIAL_STATE__" in script.string:
+        # 查找包含 JSON 数据的脚本
+        script = self.page.script(STATE_MARKER)
+        if script:
+            start = script.index("{", script.index("window.__INITIAL_STATE__="))
+            with phase("decode"):
                 try:
-                    # 提取 JSON 数据
-                    data_text = script.string.split("window.__INITIAL_STATE__=")[1]
+                    # 只解码 note.firstNoteId 和 note.noteDetailMap，忽略状态中的其余部分
+                    first_note_id = decode_key(script, "firstNoteId", start)
+                    note_detail_map = decode_key(script, "noteDetailMap", start) or {}
+                    self.data_dict = {
+                        "note": {
+                            "firstNoteId": first_note_id,
+                            "noteDetailMap": {first_note_id: note_detail_map.get(first_note_id, {})},
+                        }
+                    }
+                except ValueError as e:
+                    # 无法直接定位（键名重复或经过转义）时整体解码
+                    logger.warning(f"小红书页面数据无法直接定位，改为整体解码: {e}")
+                    data_text = script.split("window.__INITIAL_STATE__=")[1]
                     # 把字符串中的undefined替换为null
                     data_text = data_text.replace("undefined", "null")
-                    try:
-                        self.data_dict = json.loads(data_text)
-                        self.get_image_list()
-                        self.get_video()
-                        self.get_meta_description()
-                    except json.JSONDecodeError as e:
-                        raise e
-                    break
-                except Exception as e:
-                    raise e
+                    self.data_dict = json.loads(data_text)
+            self.get_image_list()
+            self.get_video()
+            self.get_meta_description()
+        else:
+            raise ValueError(f"小红书页面中没有作品数据（可能是验证码、登录页或页面结构变化）: {self.final_url}")
 
     def get_meta_description(self):
         """获取页面的元描述"""
-        meta = self.soup.find(
-            "meta", attrs={"name": "description"}
-        ) or self.soup.find("meta", attrs={"property": "og:description"})
-        description = meta.get("content", "") if meta else ""
-        self.description = description
+        self.description = self.page.meta(name="description") or self.page.meta(
+            property="og:description"
+        )
 
     def get_image_list(self):
         """获取图片列表"""
@@ -103,7 +151,7 @@ class Xiaohongshu:
                 live_url = image.get("stream", {}).get("h264", [{}])[0].get("masterUrl")
                 if live_url:
                     self.live_list.append(live_url)
-            self.image_list = Image(token_list, self.type).to_dict()
+            self.image_list = list(Image(token_list, self.type).to_dict())
         except Exception as e:
             raise e
 
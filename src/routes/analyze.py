@@ -1,12 +1,18 @@
-from typing import Optional
+import math
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from src.app.kuaishou.index import Kuaishou
-from src.app.douyin.index import Douyin
-from src.app.weibo.index import Weibo
 from src.utils import config, get_analyze_logger,get_utils_logger
-from src.app.xiaohongshu.index import Xiaohongshu
 from src.routes.youtube import router as youtube_router
+from src.app.registry import detect_platform, find_supported_urls, get_parser
+from src.services.analyze_service import AnalyzeService
+from src.services.job_service import JobService, QueueFullError
+from src.utils.codec import dumps_json
+from src.utils.errors import RateLimitedError
+from src.utils.host_guard import host_guard_stats
+from src.utils.metrics import MetricFamily, register_collector
+from src.utils.short_link import short_link_cache
 
 # 获取应用日志器
 logger = get_analyze_logger()
@@ -19,6 +25,19 @@ class AnalyzeParams(BaseModel):
     format: Optional[str] = "json"
 
 
+class BatchAnalyzeParams(BaseModel):
+    urls: List[str]
+    type: Optional[str] = "png"
+    concurrency: Optional[int] = None
+    stream: Optional[bool] = False
+
+
+class MultiAnalyzeParams(BaseModel):
+    text: str
+    type: Optional[str] = "png"
+    concurrency: Optional[int] = None
+
+
 # 创建路由器
 router = APIRouter(
     prefix="/analyze",
@@ -29,54 +48,197 @@ router = APIRouter(
 # 包含YouTube路由
 router.include_router(youtube_router)
 
+analyze_service = AnalyzeService()
+job_service = JobService(analyze_service)
+
+
+def _collect_analyze_metrics():
+    stats = analyze_service.stats()
+    caches = {
+        "result": stats["result_cache"],
+        "negative": stats["negative_cache"],
+        "short_link": short_link_cache.stats(),
+        "snapshot": stats["snapshot"],
+    }
+    hits = MetricFamily("cache_hits_total", "counter", "缓存命中次数")
+    misses = MetricFamily("cache_misses_total", "counter", "缓存未命中次数")
+    ratio = MetricFamily("cache_hit_ratio", "gauge", "缓存命中率")
+    entries = MetricFamily("cache_entries", "gauge", "缓存条目数")
+    for name, cache in caches.items():
+        hits.add(cache["hits"], cache=name)
+        misses.add(cache["misses"], cache=name)
+        ratio.add(cache["hit_ratio"], cache=name)
+        entries.add(cache.get("size", cache.get("entries", 0)), cache=name)
+
+    single_flight = stats["single_flight"]
+    jobs = job_service.stats()
+    job_counts = MetricFamily("analyze_jobs", "gauge", "保留中的异步解析任务数")
+    for status, count in jobs["jobs"].items():
+        job_counts.add(count, status=status)
+
+    breaker_open = MetricFamily("host_circuit_open", "gauge", "主机熔断器是否断开（半开也计为 1）")
+    rate_rejected = MetricFamily("host_rate_limited_total", "counter", "因限流被拒绝的出站请求数")
+    for host, guard in host_guard_stats().items():
+        breaker_open.add(int(guard["breaker"]["state"] != "closed"), host=host)
+        rate_rejected.add(guard["rate_limit"]["rejected"], host=host)
+
+    return [
+        hits, misses, ratio, entries,
+        MetricFamily("analyze_in_flight", "gauge", "正在执行的去重后解析请求数").add(single_flight["in_flight"]),
+        MetricFamily("analyze_coalesced_total", "counter", "被合并的并发相同请求数").add(single_flight["coalesced"]),
+        MetricFamily("analyze_job_queue_size", "gauge", "等待执行的异步解析任务数").add(jobs["queue_size"]),
+        MetricFamily("analyze_job_rejected_total", "counter", "因队列已满被拒绝的任务数").add(jobs["rejected"]),
+        job_counts, breaker_open, rate_rejected,
+    ]
+
+
+register_collector(_collect_analyze_metrics)
+
+
+def _rate_limited(e: RateLimitedError, detail) -> HTTPException:
+    """出站限流转换为 429，Retry-After 告知客户端多久后重试"""
+    logger.warning(f"出站请求被限流: {str(e)}")
+    return HTTPException(
+        status_code=429, detail=detail, headers={"Retry-After": str(max(math.ceil(e.retry_after), 1))}
+    )
+
 # 无前缀的POST端点
 @router.post("")
 async def process_analyze(params: AnalyzeParams):
     utils_logger.info(f"处理URL (POST): {params.url}")
     try:
         url = params.url
-        app_type = ""
-        # 判断url是否包含小红书或抖音
-        if any(keyword in url for keyword in config.APP_TYPE_KEYWORD["xiaohongshu"]):
-            app_type = "xiaohongshu"
-        elif any(keyword in url for keyword in config.APP_TYPE_KEYWORD["douyin"]):
-            app_type = "douyin"
-        elif any(keyword in url for keyword in config.APP_TYPE_KEYWORD["kuaishou"]):
-            app_type = "kuaishou"
-        elif any(keyword in url for keyword in config.APP_TYPE_KEYWORD["weibo"]):
-            app_type = "weibo"
-        else:
+        # 根据链接域名判断平台
+        app_type = detect_platform(url)
+        if not app_type:
             from src.utils.response import Response
             return Response.error("不支持的URL")
         
-        
-        # 根据app_type选择对应的模块
-        if app_type == 'xiaohongshu':
-            from src.app.xiaohongshu.index import Xiaohongshu
-            xiaohongshu = Xiaohongshu(url, params.type)
-            return xiaohongshu.to_dict()
-        elif app_type == 'douyin':
-            from src.app.douyin.index import Douyin
-            douyin = Douyin(url, params.type)
-            return douyin.to_dict()
-        elif app_type == 'kuaishou':
-            from src.app.kuaishou.index import Kuaishou
-            kuaishou = Kuaishou(url, params.type)
-            return kuaishou.to_dict()
-        elif app_type == 'weibo':
-            from src.app.weibo.index import Weibo
-            weibo = Weibo(url, params.type)
-            return weibo.to_dict()
-        else:
-            from src.utils.response import Response
-            return Response.error("请联系客服！")
+        # 根据app_type选择对应的模块，结果优先从缓存获取
+        return await analyze_service.analyze(app_type, url, params.type)
     
+    except RateLimitedError as e:
+        from src.utils.response import Response
+        raise _rate_limited(e, Response.error(str(e)))
     except Exception as e:
         logger.error(f"处理聚合数据出错: {url}", exc_info=True)
         logger.error(f"处理聚合数据出错: {str(e)}", exc_info=True)
         from src.utils.response import Response
         raise HTTPException(status_code=500, detail=Response.error(str(e)))
 
+# 批量解析
+@router.post("/batch")
+async def process_batch(params: BatchAnalyzeParams):
+    """
+    批量解析多个分享链接
+
+    参数:
+    - urls: 分享文本或链接列表，相同作品只解析一次
+    - type: 图片类型，支持 "png" 或 "webp"
+    - concurrency: 并发数，不超过服务端配置的上限
+    - stream: 是否以 NDJSON 流式返回，每解析完一条立即输出一行
+
+    单条解析失败不影响其他链接；非流式时结果按输入顺序返回，
+    流式时按完成顺序返回，每行带有对应的输入序号 index
+    """
+    from src.utils.response import Response
+    utils_logger.info(f"批量处理URL (POST): {len(params.urls)} 条")
+    max_size = config.ANALYZE_BATCH_STREAM_MAX_SIZE if params.stream else config.ANALYZE_BATCH_MAX_SIZE
+    if not params.urls:
+        return Response.error("urls 不能为空")
+    if len(params.urls) > max_size:
+        return Response.error(f"单次最多解析 {max_size} 条链接")
+    if params.stream:
+        return StreamingResponse(
+            _ndjson_lines(params), media_type="application/x-ndjson"
+        )
+    try:
+        items = await analyze_service.analyze_batch(params.urls, params.type, params.concurrency)
+        return Response.success(_batch_summary(items), "获取成功")
+    except Exception as e:
+        logger.error(f"批量处理URL出错: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=Response.error(str(e)))
+
+def _batch_summary(items: List[dict]) -> dict:
+    """统计批量解析结果的成功和失败数"""
+    from src.utils.response import Response
+    succeeded = sum(1 for item in items if item["code"] == Response.SUCCESS_CODE)
+    return {
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+        "items": items,
+    }
+
+# 一段文本中的多个链接
+@router.post("/multi")
+async def process_multi(params: MultiAnalyzeParams):
+    """
+    解析一段文本中的所有分享链接
+
+    参数:
+    - text: 包含一个或多个分享链接的文本，不支持的平台的链接会被忽略
+    - type: 图片类型，支持 "png" 或 "webp"
+    - concurrency: 并发数，不超过服务端配置的上限
+
+    链接去重后并发解析，结果按链接在文本中出现的顺序返回
+    """
+    from src.utils.response import Response
+    urls = [url for _, url in find_supported_urls(params.text)]
+    utils_logger.info(f"处理多链接文本 (POST): {len(urls)} 条")
+    if not urls:
+        return Response.error("文本中没有支持的URL")
+    if len(urls) > config.ANALYZE_BATCH_MAX_SIZE:
+        return Response.error(f"单次最多解析 {config.ANALYZE_BATCH_MAX_SIZE} 条链接")
+    try:
+        items = await analyze_service.analyze_batch(urls, params.type, params.concurrency)
+        return Response.success(_batch_summary(items), "获取成功")
+    except Exception as e:
+        logger.error(f"处理多链接文本出错: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=Response.error(str(e)))
+
+async def _ndjson_lines(params: BatchAnalyzeParams):
+    """将批量解析结果逐条编码为 NDJSON 行"""
+    async for item in analyze_service.iter_batch(params.urls, params.type, params.concurrency):
+        yield dumps_json(item) + b"\n"
+
+# 异步解析任务
+@router.post("/jobs")
+async def submit_analyze_job(params: AnalyzeParams):
+    """
+    提交异步解析任务，立即返回任务 ID
+
+    参数:
+    - url: 分享文本或链接，自动识别平台
+    - type: 图片类型，支持 "png" 或 "webp"
+
+    通过 GET /analyze/jobs/{job_id} 轮询任务状态和结果
+    """
+    from src.utils.response import Response
+    utils_logger.info(f"提交解析任务: {params.url}")
+    app_type = detect_platform(params.url)
+    if not app_type:
+        return Response.error("不支持的URL")
+    try:
+        job = job_service.submit(app_type, params.url, params.type)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=Response.error(str(e)))
+    return Response.success({"job_id": job.id, "status": job.status}, "提交成功")
+
+
+@router.get("/jobs/{job_id}")
+async def get_analyze_job(job_id: str):
+    """
+    查询解析任务
+
+    status 为 pending、running、succeeded 或 failed，完成后 result 为解析结果
+    """
+    from src.utils.response import Response
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=Response.error("任务不存在或已过期"))
+    return Response.success(job.to_dict(), "获取成功")
+
 # 小红书
 @router.post("/xiaohongshu")
 async def process_xiaohongshu(params: AnalyzeParams):
@@ -90,15 +252,16 @@ async def process_xiaohongshu(params: AnalyzeParams):
     """
     logger.info(f"处理小红书URL (POST): {params.url}")
     try:
-        xiaohongshu = Xiaohongshu(params.url, params.type)
-        
         if params.format.lower() == "html":
-            # 返回 HTML 内容
+            # 返回完整的 HTML 内容，不提前停止下载
+            xiaohongshu = await get_parser("xiaohongshu").create(params.url, params.type, early_stop=False, extract=False)
             from src.utils.response import Response
             return Response.success(xiaohongshu.html, "获取成功")
         else:
             # 返回结构化数据
-            return xiaohongshu.to_dict()
+            return await analyze_service.analyze("xiaohongshu", params.url, params.type)
+    except RateLimitedError as e:
+        raise _rate_limited(e, str(e))
     except Exception as e:
         logger.error(f"处理小红书URL出错: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -116,15 +279,16 @@ async def process_douyin(params: AnalyzeParams):
     """
     logger.info(f"处理抖音URL (POST): {params.url}")
     try:
-        douyin = Douyin(params.url, params.type)
-        
         if params.format.lower() == "html":
-            # 返回 HTML 内容
+            # 返回完整的 HTML 内容，不提前停止下载
+            douyin = await get_parser("douyin").create(params.url, params.type, early_stop=False, extract=False)
             from src.utils.response import Response
             return Response.success(douyin.html, "获取成功")
         else:
             # 返回结构化数据
-            return douyin.to_dict()
+            return await analyze_service.analyze("douyin", params.url, params.type)
+    except RateLimitedError as e:
+        raise _rate_limited(e, str(e))
     except Exception as e:
         logger.error(f"处理抖音URL出错: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -142,15 +306,16 @@ async def process_kuaishou(params: AnalyzeParams):
     """
     logger.info(f"处理快手URL (POST): {params.url}")
     try:
-        kuaishou = Kuaishou(params.url, params.type)
-        
         if params.format.lower() == "html":
-            # 返回 HTML 内容
+            # 返回完整的 HTML 内容，不提前停止下载
+            kuaishou = await get_parser("kuaishou").create(params.url, params.type, early_stop=False, extract=False)
             from src.utils.response import Response
             return Response.success(kuaishou.html, "获取成功")
         else:
             # 返回结构化数据
-            return kuaishou.to_dict()
+            return await analyze_service.analyze("kuaishou", params.url, params.type)
+    except RateLimitedError as e:
+        raise _rate_limited(e, str(e))
     except Exception as e:
         logger.error(f"处理快手URL出错: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -168,15 +333,32 @@ async def process_weibo(params: AnalyzeParams):
     """
     logger.info(f"处理微博URL (POST): {params.url}")
     try:
-        weibo = Weibo(params.url)
-        
         if params.format.lower() == "html":
-            # 返回 HTML 内容
+            # 返回完整的 HTML 内容，不提前停止下载
+            weibo = await get_parser("weibo").create(params.url, params.type, early_stop=False, extract=False)
             from src.utils.response import Response
             return Response.success(weibo.html, "获取成功")
         else:
             # 返回结构化数据
-            return weibo.to_dict()
+            return await analyze_service.analyze("weibo", params.url, params.type)
+    except RateLimitedError as e:
+        raise _rate_limited(e, str(e))
     except Exception as e:
         logger.error(f"处理抖音URL出错: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# 缓存统计
+@router.get("/stats")
+async def get_analyze_stats():
+    """获取解析结果缓存的命中统计、合并的并发请求数及异步任务队列状态"""
+    from src.utils.response import Response
+    return Response.success({**analyze_service.stats(), "jobs": job_service.stats()}, "获取成功")
+
+
+# 出站主机状态
+@router.get("/hosts")
+async def get_host_stats():
+    """获取各平台主机的熔断状态及限流次数"""
+    from src.utils.response import Response
+    return Response.success(host_guard_stats(), "获取成功")
@@ -9,6 +9,7 @@ from hivision.creator.layout_calculator import (
     generate_layout_image,
 )
 from hivision.creator.choose_handler import choose_handler
+from hivision.creator import face_detector, human_matting
 from hivision.utils import (
     add_background,
     resize_image_to_kb,
@@ -21,6 +22,8 @@ from hivision.utils import (
 import numpy as np
 import cv2
 from src.utils import get_app_logger
+from src.utils.timing import phase
+from src.utils.metrics import MetricFamily, register_collector
 
 # 获取日志记录器
 logger = get_app_logger()
@@ -33,6 +36,28 @@ router = APIRouter(
 )
 
 creator = IDCreator()
+# 各处理阶段的耗时写入 Server-Timing 响应头
+creator.timer = phase
+
+# 模型会话在首次使用时加载并常驻内存，按模块全局变量判断是否已加载
+ONNX_SESSIONS = {
+    "hivision_modnet": (human_matting, "HIVISION_MODNET_SESS"),
+    "modnet_photographic_portrait_matting": (human_matting, "MODNET_PHOTOGRAPHIC_PORTRAIT_MATTING_SESS"),
+    "rmbg-1.4": (human_matting, "RMBG_SESS"),
+    "birefnet-v1-lite": (human_matting, "BIREFNET_V1_LITE_SESS"),
+    "retinaface-resnet50": (face_detector, "RETINAFCE_SESS"),
+    "mtcnn": (face_detector, "mtcnn"),
+}
+
+
+def _collect_model_metrics():
+    family = MetricFamily("onnx_session_loaded", "gauge", "模型推理会话是否已加载（1 为常驻内存）")
+    for model, (module, attr) in ONNX_SESSIONS.items():
+        family.add(int(getattr(module, attr, None) is not None), model=model)
+    return [family]
+
+
+register_collector(_collect_model_metrics)
 
 # 定义请求模型
 class IdPhotoCreateRequest(BaseModel):
@@ -126,7 +151,8 @@ def error_response(message: str, code: int = 400) -> Dict[str, Any]:
 async def idphoto_inference(request: IdPhotoCreateRequest):  
     logger.info("证件照制作请求")
     # 使用base64解码
-    img = base64_2_numpy(request.input_image_base64)
+    with phase("decode"):
+        img = base64_2_numpy(request.input_image_base64)
 
     # ------------------- 选择抠图与人脸检测模型 -------------------
     choose_handler(creator, request.human_matting_model, request.face_detect_model)
@@ -151,17 +177,18 @@ async def idphoto_inference(request: IdPhotoCreateRequest):
         return error_response("未检测到人脸或检测到多个人脸")
     # 如果检测到人脸数量等于1, 则返回标准证和高清照结果（png 4通道图像）
     else:
-        result_image_standard_bytes = save_image_dpi_to_bytes(cv2.cvtColor(result.standard, cv2.COLOR_RGBA2BGRA), None, request.dpi)
-        
-        result_data = {
-            "status": True,
-            "image_base64_standard": bytes_2_base64(result_image_standard_bytes),
-        }
-
-        # 如果hd为True, 则增加高清照结果（png 4通道图像）
-        if request.hd:
-            result_image_hd_bytes = save_image_dpi_to_bytes(cv2.cvtColor(result.hd, cv2.COLOR_RGBA2BGRA), None, request.dpi)
-            result_data["image_base64_hd"] = bytes_2_base64(result_image_hd_bytes)
+        with phase("encode"):
+            result_image_standard_bytes = save_image_dpi_to_bytes(cv2.cvtColor(result.standard, cv2.COLOR_RGBA2BGRA), None, request.dpi)
+            
+            result_data = {
+                "status": True,
+                "image_base64_standard": bytes_2_base64(result_image_standard_bytes),
+            }
+
+            # 如果hd为True, 则增加高清照结果（png 4通道图像）
+            if request.hd:
+                result_image_hd_bytes = save_image_dpi_to_bytes(cv2.cvtColor(result.hd, cv2.COLOR_RGBA2BGRA), None, request.dpi)
+                result_data["image_base64_hd"] = bytes_2_base64(result_image_hd_bytes)
 
     return success_response(result_data)
 
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, HTTPException, Response, Query
+from fastapi import APIRouter, HTTPException, Request, Response, Query
 from typing import Optional
 from pydantic import BaseModel
 import requests
-from src.app.test.index import Test
 from src.utils import get_global_logger, config
 import httpx
-from fastapi.responses import StreamingResponse
-import io
+from fastapi.responses import FileResponse, StreamingResponse
+from src.services.media_service import MediaService
+from src.utils.errors import MediaTooLargeError, RangeNotSatisfiableError, UnsupportedImageError
+from src.utils.http_range import content_range, etag_matches, parse_range
+from src.utils.image_transform import ImageVariant
+from src.utils.media_cache import CachedMedia
+from src.utils.metrics import MetricFamily, register_collector
+import time
 import ipaddress
 from urllib.parse import urlparse
 
@@ -20,86 +25,205 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+media_service = MediaService()
+
+
+def _collect_media_metrics():
+    stats = media_service.cache.stats()
+    return [
+        MetricFamily("media_cache_hits_total", "counter", "媒体缓存命中次数").add(stats["hits"]),
+        MetricFamily("media_cache_misses_total", "counter", "媒体缓存未命中次数").add(stats["misses"]),
+        MetricFamily("media_cache_evictions_total", "counter", "媒体缓存淘汰的文件数").add(stats["evictions"]),
+        MetricFamily("media_cache_bytes", "gauge", "媒体缓存占用的字节数").add(stats["bytes"]),
+    ]
+
+
+register_collector(_collect_media_metrics)
+
 # 定义请求参数模型
 class SystemParams(BaseModel):
     url: str
     filename: Optional[str] = None  # 可选的文件名参数
 
+async def _proxy(
+    url: str, headers: dict, request: Request, attachment: bool = False, filename: Optional[str] = None
+) -> Response:
+    """
+    流式代理媒体文件
+
+    转发客户端的 Range/If-Range，源站返回 206 时原样转发状态码和 Content-Range；
+    响应体按数据块边下载边转发。attachment 为真时以附件形式下载
+    """
+    cached = await media_service.cached(url)
+    if cached is not None:
+        extra_headers = {}
+        if attachment:
+            extra_headers["Content-Disposition"] = f"attachment; filename={_filename(url, filename)}"
+        response = await _serve_cached(cached, request, extra_headers)
+        if response is not None:
+            return response
+
+    range_headers = media_service.range_headers(request.headers)
+    try:
+        # 只读取响应头，响应体按数据块边下载边转发
+        response = await media_service.open(url, {**headers, **range_headers})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except httpx.HTTPError as e:
+        logger.error(f"请求远程文件出错: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=502, detail=f"远程服务器错误: {str(e)}")
+
+    if response.status_code == 416:
+        # 请求的范围超出文件大小，转发源站给出的实际大小
+        await response.aclose()
+        return Response(status_code=416, headers=media_service.passthrough_headers(response))
+    if response.status_code >= 400:
+        await response.aclose()
+        logger.error(f"HTTP错误: {response.status_code} {url}")
+        raise HTTPException(status_code=response.status_code, detail=f"远程服务器错误: {response.status_code}")
+
+    response_headers = media_service.passthrough_headers(response)
+    if attachment:
+        response_headers["Content-Disposition"] = f"attachment; filename={_filename(url, filename, response)}"
+    # 完整的文件写入缓存，只请求部分范围时由 cache_writer 跳过
+    writer = await media_service.cache_writer(url, response)
+    return StreamingResponse(
+        media_service.iter_body(response, writer),
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type", "application/octet-stream"),
+        headers=response_headers,
+    )
+
+async def _serve_cached(cached: CachedMedia, request: Request, extra_headers: dict) -> Optional[Response]:
+    """
+    从磁盘缓存返回文件
+
+    If-None-Match 与 ETag 一致时返回 304；带 Range 时返回对应的字节范围；
+    否则以 FileResponse 返回完整文件。文件已被淘汰时返回 None，改为请求源站
+    """
+    headers = {
+        "ETag": cached.etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": f"public, max-age={max(int(cached.expires_at - time.time()), 0)}",
+        **extra_headers,
+    }
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # If-Range 与 ETag 不一致说明客户端已有的部分内容过期，返回完整文件
+    if range_header and (not if_range or if_range == cached.etag):
+        try:
+            byte_range = parse_range(range_header, cached.size)
+        except RangeNotSatisfiableError:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{cached.size}"})
+        if byte_range is not None:
+            f = await media_service.open_file(cached)
+            if f is None:
+                return None
+            start, end = byte_range
+            return StreamingResponse(
+                media_service.iter_file(f, start, end),
+                status_code=206,
+                media_type=cached.content_type,
+                headers={
+                    **headers,
+                    "Content-Range": content_range(start, end, cached.size),
+                    "Content-Length": str(end - start + 1),
+                },
+            )
+    return FileResponse(cached.path, media_type=cached.content_type, headers=headers)
+
+def _filename(url: str, filename: Optional[str], response: Optional[httpx.Response] = None) -> str:
+    """下载文件名：优先使用参数，其次源站的 Content-Disposition，最后从URL路径获取"""
+    if filename:
+        return filename
+    cd_header = response.headers.get("content-disposition", "") if response is not None else ""
+    if "filename=" in cd_header:
+        return cd_header.split("filename=")[1].strip('"\'')
+    return url.split("/")[-1].split("?")[0] or "downloaded_file"
+
 # 无前缀的POST端点
 @router.post("/get_file_stream")
-async def process_get_file_stream(params: SystemParams):
+async def process_get_file_stream(params: SystemParams, request: Request):
     """
     将文件的url转换成流返回
     
     参数:
     - url: 文件链接
     - filename: 可选的文件名，用于设置Content-Disposition header
+
+    支持 Range 请求，视频拖动进度或断点续传时只下载需要的部分
     """
     logger.info(f"处理文件流请求 (POST): {params.url}")
-    try:
-        async with httpx.AsyncClient() as client:
-            # 使用stream=True来支持大文件流式传输
-            response = await client.get(params.url, follow_redirects=True)
-            response.raise_for_status()  # 确保请求成功
-            
-            # 获取内容类型
-            content_type = response.headers.get("content-type", "application/octet-stream")
-            
-            # 处理文件名
-            filename = params.filename
-            if not filename:
-                # 尝试从URL或响应头获取文件名
-                cd_header = response.headers.get("content-disposition", "")
-                if "filename=" in cd_header:
-                    filename = cd_header.split("filename=")[1].strip('"\'')
-                else:
-                    # 从URL路径获取文件名
-                    filename = params.url.split("/")[-1].split("?")[0] or "downloaded_file"
-            
-            # 设置响应头
-            headers = {
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
-            
-            # 返回流式响应
-            return StreamingResponse(
-                io.BytesIO(response.content), 
-                media_type=content_type,
-                headers=headers
-            )
-    except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP错误: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=e.response.status_code, detail=f"远程服务器错误: {str(e)}")
-    except Exception as e:
-        logger.error(f"处理文件流请求出错: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _proxy(
+        params.url, media_service.request_headers(params.url), request, attachment=True, filename=params.filename
+    )
+
+@router.get("/get_file_stream")
+async def process_get_file_stream_get(request: Request, url: str, filename: Optional[str] = None):
+    """
+    将文件的url转换成流返回，参数同 POST，可直接作为 <video> 的 src 使用
+    """
+    logger.info(f"处理文件流请求 (GET): {url}")
+    return await _proxy(url, media_service.request_headers(url), request, attachment=True, filename=filename)
     
 @router.get("/image_proxy")
-async def process_image_proxy(url: str):
+async def process_image_proxy(
+    request: Request,
+    url: str,
+    platform: Optional[str] = None,
+    w: Optional[int] = None,
+    h: Optional[int] = None,
+    fmt: Optional[str] = None,
+    q: Optional[int] = None,
+):
     """
-    处理图片代理请求 设置referer为weibo.com 返回图片信息供前端展示
-    
+    处理图片代理请求，按图片所属平台设置 Referer 和 User-Agent，返回图片信息供前端展示
+
     参数:
     - url: 图片链接
+    - platform: 可选，指定平台（xiaohongshu、douyin、kuaishou、weibo），默认按图片域名识别
+    - w / h: 可选，缩放到指定宽、高以内（保持比例，不放大）
+    - fmt: 可选，输出格式 webp、jpeg、png，指定了 w/h/q 时默认 webp
+    - q: 可选，编码质量 1-100
+
+    未指定 w/h/fmt/q 时原样返回原图
     """
     try:
-        headers = {
-            'Referer': 'https://weibo.com',  # 设置合法的Referer
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-        }
-        response = requests.get(url, headers=headers, stream=True)
-        # 获取原始响应的内容类型
-        content_type = response.headers.get('Content-Type')
-        
-        # 构建响应时传递原始内容类型
-        return Response(
-            content=response.content,
-            media_type=content_type
-        )
-    
-    except Exception as e:
-        logger.error(f"处理图片代理请求出错: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+        variant = ImageVariant.from_params(w, h, fmt, q)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = media_service.request_headers(url, platform)
+    if variant is None:
+        return await _proxy(url, headers, request)
+
+    cached = await media_service.cached(url, variant.key)
+    if cached is not None:
+        response = await _serve_cached(cached, request, {})
+        if response is not None:
+            return response
+
+    try:
+        image = await media_service.render(url, headers, variant)
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTP错误: {e.response.status_code} {url}")
+        raise HTTPException(status_code=e.response.status_code, detail=f"远程服务器错误: {e.response.status_code}")
+    except httpx.HTTPError as e:
+        logger.error(f"请求远程文件出错: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=502, detail=f"远程服务器错误: {str(e)}")
+    except MediaTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedImageError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"ETag": image.etag, "Cache-Control": f"public, max-age={config.MEDIA_CACHE_TTL}"}
+    if etag_matches(request.headers.get("if-none-match"), image.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=image.data, media_type=image.content_type, headers=headers)
 
 @router.get("/proxy")
 def proxy_download(url: str = Query(..., description="目标资源 URL")):
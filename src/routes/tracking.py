@@ -2,6 +2,7 @@ from fastapi import APIRouter, Request, Query
 from src.models.tracking import TrackingEvent, SourcePlatform
 from src.services.tracking_service import TrackingService
 from src.utils.response import Response
+from src.utils.codec import CodecResponse
 from typing import Optional
 from src.utils.logger import get_tracking_logger
 
@@ -53,4 +54,5 @@ async def get_events(
         user_id=user_id,
         limit=limit
     )
-    return Response.success(events, "获取成功") 
\ No newline at end of file
+    # 结果行只含基础类型和 datetime，直接编码，跳过逐行遍历的 jsonable_encoder
+    return CodecResponse(Response.success(events, "获取成功")) 
\ No newline at end of file
@@ -0,0 +1,210 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.app.registry import detect_platform, extract_post_id, get_parser
+from src.utils import find_url, get_analyze_logger, config
+from src.utils.cache import TTLCache
+from src.utils.errors import LinkUnavailableError
+from src.utils.response import Response
+from src.utils.short_link import short_link_cache
+from src.utils.single_flight import SingleFlight
+from src.utils.snapshot_store import snapshot_store
+
+logger = get_analyze_logger()
+
+
+def cache_key(app_type: str, url: str, type: str) -> str:
+    """
+    生成结果缓存的键
+
+    能识别出作品 ID 时按 平台 + 作品 ID 缓存，同一作品的不同分享文案命中同一条目；
+    否则（如短链）退化为 平台 + 去掉锚点的链接
+    """
+    post_id = extract_post_id(app_type, url)
+    if post_id:
+        return f"{app_type}:{post_id}:{type}"
+    return f"{app_type}:url:{url.split('#')[0]}:{type}"
+
+
+class AnalyzeService:
+    def __init__(self):
+        self.result_cache = TTLCache(
+            max_size=config.ANALYZE_CACHE_MAX_SIZE,
+            default_ttl=config.ANALYZE_CACHE_DEFAULT_TTL,
+        )
+        # 已失效链接的负缓存，命中时直接返回错误，不再抓取
+        self.negative_cache = TTLCache(
+            max_size=config.NEGATIVE_CACHE_MAX_SIZE,
+            default_ttl=config.NEGATIVE_CACHE_TTL,
+        )
+        # 合并并发的相同解析请求
+        self.single_flight = SingleFlight()
+
+    async def analyze(self, app_type: str, text: str, type: str) -> dict:
+        """
+        解析分享内容，优先返回缓存结果
+
+        参数:
+            app_type: 平台类型
+            text: 分享文本或链接
+            type: 图片类型
+
+        返回:
+            统一响应结构的字典
+        """
+        url = find_url(text)
+        if not url:
+            parser = await get_parser(app_type).create(text, type)
+            return parser.to_dict()
+
+        key = self.request_key(app_type, url, type)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            logger.info(f"命中解析结果缓存: {key}")
+            return cached
+        message = self.negative_cache.get(key)
+        if message is not None:
+            logger.info(f"命中失效链接缓存: {key}")
+            raise LinkUnavailableError(message, url)
+
+        # 同一作品的并发请求只抓取解析一次
+        return await self.single_flight.do(
+            key, lambda: self._fetch(app_type, url, type, key)
+        )
+
+    async def analyze_batch(self, texts: List[str], type: str, concurrency: Optional[int] = None) -> List[dict]:
+        """
+        批量解析分享内容
+
+        按规范链接去重后并发解析，整体并发数和单个主机的并发数都有上限；
+        单条失败只体现在该条结果中，不影响整批
+
+        参数:
+            texts: 分享文本或链接列表
+            type: 图片类型
+            concurrency: 并发数，不超过配置的上限
+
+        返回:
+            与输入顺序一致的结果列表，每项包含 index、url 以及统一响应结构的字段
+        """
+        results = [item async for item in self.iter_batch(texts, type, concurrency)]
+        results.sort(key=lambda item: item["index"])
+        return results
+
+    async def iter_batch(
+        self, texts: List[str], type: str, concurrency: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """
+        批量解析分享内容，按完成顺序逐条产出结果
+
+        结果项与 analyze_batch 相同，通过 index 对应输入位置；
+        迭代提前结束（如客户端断开）时取消尚未完成的解析
+        """
+        limit = min(concurrency or config.ANALYZE_BATCH_CONCURRENCY, config.ANALYZE_BATCH_CONCURRENCY)
+        semaphore = asyncio.Semaphore(max(limit, 1))
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        async def run(key: str, app_type: str, url: str) -> Tuple[str, dict]:
+            host = urlparse(short_link_cache.resolve(url) or url).hostname or ""
+            if host not in host_semaphores:
+                host_semaphores[host] = asyncio.Semaphore(config.ANALYZE_BATCH_PER_HOST_CONCURRENCY)
+            # 先占主机名额再占全局名额，避免等待同一主机时占住全局并发
+            async with host_semaphores[host], semaphore:
+                try:
+                    return key, await self.analyze(app_type, url, type)
+                except Exception as e:
+                    logger.error(f"批量解析出错: {url}, {str(e)}")
+                    return key, Response.error(str(e))
+
+        # 相同作品只解析一次，结果分发给所有对应的输入位置
+        jobs: Dict[str, Tuple[str, str]] = {}
+        indexes: Dict[str, List[int]] = {}
+        unsupported = []
+        for index, text in enumerate(texts):
+            app_type = detect_platform(text)
+            url = find_url(text)
+            if not app_type or not url:
+                unsupported.append(index)
+                continue
+            key = self.request_key(app_type, url, type)
+            if key not in jobs:
+                jobs[key] = (app_type, url)
+                indexes[key] = []
+            indexes[key].append(index)
+
+        # 同时存在的任务数有上限（略多于并发数，等待同一主机的任务不会占满窗口），
+        # 完成的任务立即产出并释放，内存占用与批量大小无关
+        window = max(limit, 1) * 2
+        pending = iter(jobs.items())
+        running = set()
+        try:
+            for index in unsupported:
+                yield {"index": index, "url": texts[index], **Response.error("不支持的URL")}
+            while True:
+                for key, (app_type, url) in pending:
+                    running.add(asyncio.ensure_future(run(key, app_type, url)))
+                    if len(running) >= window:
+                        break
+                if not running:
+                    break
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    key, result = task.result()
+                    for index in indexes.pop(key):
+                        yield {"index": index, "url": texts[index], **result}
+        finally:
+            for task in running:
+                task.cancel()
+
+    def request_key(self, app_type: str, url: str, type: str) -> str:
+        """请求的规范键，短链已解析过时使用最终链接中的作品 ID"""
+        resolved_url = short_link_cache.resolve(url)
+        return cache_key(app_type, resolved_url or url, type)
+
+    async def _fetch(self, app_type: str, url: str, type: str, key: str) -> dict:
+        """
+        抓取并解析页面，成功的结果写入缓存
+
+        只有确认失效的链接（404/410、跳转到 404 页面）写入负缓存；验证码、登录页等没有作品数据的页面
+        属于临时的解析失败，不写入负缓存，但删除其快照，重试时重新抓取；
+        短链只在最终页面成功解析后记录解析结果，跳转到验证码、登录页等的结果不会被缓存
+        """
+        try:
+            parser = await get_parser(app_type).create(url, type)
+        except LinkUnavailableError as e:
+            short_link_cache.forget(url)
+            self.negative_cache.set(key, str(e))
+            # 失效页面的快照不再保留，负缓存过期后重新抓取
+            await asyncio.to_thread(snapshot_store.discard, url)
+            # 短链指向的最终链接同样已失效
+            if e.url:
+                final_key = cache_key(app_type, e.url, type)
+                if final_key != key:
+                    self.negative_cache.set(final_key, str(e))
+            raise
+        except ValueError:
+            short_link_cache.forget(url)
+            await asyncio.to_thread(snapshot_store.discard, url)
+            raise
+        result = parser.to_dict()
+
+        if result.get("code") == Response.SUCCESS_CODE:
+            ttl = config.ANALYZE_CACHE_TTL.get(app_type)
+            self.result_cache.set(key, result, ttl)
+            final_url = str(getattr(parser, "final_url", "") or "")
+            short_link_cache.remember(url, final_url)
+            # 短链解析后再以最终链接中的作品 ID 缓存一份，其他分享入口也能命中
+            final_key = cache_key(app_type, final_url, type) if final_url else None
+            if final_key and final_key != key and extract_post_id(app_type, final_url):
+                self.result_cache.set(final_key, result, ttl)
+        return result
+
+    def stats(self) -> dict:
+        """返回缓存、请求合并及页面快照的统计信息"""
+        return {
+            "result_cache": self.result_cache.stats(),
+            "negative_cache": self.negative_cache.stats(),
+            "single_flight": self.single_flight.stats(),
+            "snapshot": snapshot_store.stats(),
+        }
@@ -0,0 +1,153 @@
+import asyncio
+import contextvars
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from src.services.analyze_service import AnalyzeService
+from src.utils import get_analyze_logger, config
+from src.utils.response import Response
+
+logger = get_analyze_logger()
+
+
+class QueueFullError(RuntimeError):
+    """任务队列已满"""
+
+
+class Job:
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    def __init__(self, app_type: str, url: str, type: str):
+        self.id = uuid.uuid4().hex
+        self.app_type = app_type
+        self.url = url
+        self.type = type
+        self.status = self.PENDING
+        self.result: Optional[dict] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "app_type": self.app_type,
+            "url": self.url,
+            "result": self.result,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobService:
+    """
+    异步解析任务
+
+    提交后立即返回任务 ID，由固定数量的后台 worker 从有界队列中取出执行；
+    队列满时拒绝新任务，完成的任务保留一段时间供轮询，过期后清理
+    """
+
+    def __init__(self, analyze_service: AnalyzeService):
+        self.analyze_service = analyze_service
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self.rejected = 0
+
+    def _ensure_workers(self):
+        """
+        第一次提交任务时在当前事件循环中启动 worker
+
+        任务创建时会复制当前的上下文变量，worker 在空白上下文中创建，
+        不继承提交第一个任务的请求的阶段耗时、响应编码等请求级状态
+        """
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=config.ANALYZE_JOB_QUEUE_SIZE)
+        self._workers = [
+            contextvars.Context().run(asyncio.ensure_future, self._worker())
+            for _ in range(config.ANALYZE_JOB_WORKERS)
+        ]
+        logger.info(f"解析任务 worker 已启动: {config.ANALYZE_JOB_WORKERS} 个")
+
+    def submit(self, app_type: str, url: str, type: str) -> Job:
+        """
+        提交解析任务
+
+        参数:
+            app_type: 平台类型
+            url: 分享文本或链接
+            type: 图片类型
+
+        返回:
+            新建的任务，队列已满时抛出 QueueFullError
+        """
+        self._ensure_workers()
+        self._cleanup()
+        job = Job(app_type, url, type)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(f"任务队列已满（{config.ANALYZE_JOB_QUEUE_SIZE}），请稍后重试")
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """获取任务，不存在或已过期时返回 None"""
+        self._cleanup()
+        return self.jobs.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = Job.RUNNING
+            job.started_at = time.time()
+            try:
+                job.result = await self.analyze_service.analyze(job.app_type, job.url, job.type)
+                job.status = Job.SUCCEEDED if job.result.get("code") == Response.SUCCESS_CODE else Job.FAILED
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"解析任务出错: {job.url}, {str(e)}")
+                job.result = Response.error(str(e))
+                job.status = Job.FAILED
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+    def _cleanup(self):
+        """清理超过保留时间的已完成任务"""
+        expire_before = time.time() - config.ANALYZE_JOB_RETENTION
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and job.finished_at < expire_before
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    async def stop(self):
+        """取消所有 worker，应用关闭时调用"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> dict:
+        """返回任务队列统计信息"""
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": len(self._workers),
+            "queue_size": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": config.ANALYZE_JOB_QUEUE_SIZE,
+            "rejected": self.rejected,
+            "jobs": counts,
+        }
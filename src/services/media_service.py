@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Mapping, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from src.app.registry import get_spec, match_media_host, platforms
+from src.utils import get_global_logger, config
+from src.utils.errors import MediaTooLargeError
+from src.utils.http_client import get_media_client
+from src.utils.http_range import covers_whole
+from src.utils.image_transform import ImageVariant, render_variant
+from src.utils.media_cache import CachedMedia, MediaCacheWriter, media_cache
+from src.utils.single_flight import SingleFlight
+
+logger = get_global_logger()
+
+
+@dataclass
+class RenderedImage:
+    """生成的图片派生版本"""
+
+    data: bytes
+    content_type: str
+    etag: str
+
+
+class MediaService:
+    """
+    媒体文件（图片、视频）代理
+
+    通过共享的媒体客户端以流式模式请求源站，按数据块转发给客户端，
+    单个下载占用的内存不超过一个数据块，首字节时间与文件大小无关；
+    完整下载的文件同时写入磁盘缓存，之后的请求直接从磁盘返回；
+    图片可按需生成缩略图或转换格式，派生版本同样写入缓存
+    """
+
+    def __init__(self):
+        self.cache = media_cache
+        # 相同版本的并发请求只转换一次
+        self.render_flight = SingleFlight()
+        self._render_semaphore: Optional[asyncio.Semaphore] = None
+
+    @staticmethod
+    def request_headers(url: str, platform: Optional[str] = None) -> dict:
+        """
+        按资源所属平台选择请求头
+
+        参数:
+            url: 资源链接，按 CDN 域名识别平台
+            platform: 指定平台，优先于域名识别
+
+        返回:
+            包含 User-Agent 的请求头，已知平台的 CDN 附带对应的 Referer
+        """
+        # 图片、视频本身已压缩，要求源站不再压缩，Content-Length 和字节范围与文件一致
+        headers = {"User-Agent": config.DEFAULT_USER_AGENT, "Accept-Encoding": "identity"}
+        if platform not in platforms():
+            platform = match_media_host(urlparse(url).hostname or "")
+        if platform:
+            referer = get_spec(platform).referer
+            if referer:
+                headers["Referer"] = referer
+        return headers
+
+    @staticmethod
+    def range_headers(headers: Mapping[str, str]) -> dict:
+        """从客户端请求头中取出需要转发给源站的 Range 和 If-Range"""
+        return {name: headers[name] for name in ("Range", "If-Range") if name in headers}
+
+    async def open(self, url: str, headers: Optional[dict] = None) -> httpx.Response:
+        """
+        以流式模式请求媒体文件，只读取响应头
+
+        参数:
+            url: 文件链接，只支持 http/https
+            headers: 请求头
+
+        返回:
+            未读取响应体的 httpx.Response，调用方通过 iter_body 读取或自行关闭
+        """
+        if urlparse(url).scheme not in ("http", "https"):
+            raise ValueError(f"不支持的链接: {url}")
+        client = get_media_client()
+        request = client.build_request("GET", url, headers=headers)
+        return await client.send(request, stream=True)
+
+    async def iter_body(
+        self, response: httpx.Response, writer: Optional[MediaCacheWriter] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        按数据块读取响应体，读完或中途停止（如客户端断开）时释放连接
+
+        指定 writer 时同时写入缓存，只有完整读完才生效
+        """
+        try:
+            async for chunk in response.aiter_bytes(config.MEDIA_CHUNK_SIZE):
+                if writer is not None and not await asyncio.to_thread(writer.write, chunk):
+                    writer = None
+                yield chunk
+            if writer is not None:
+                await asyncio.to_thread(writer.commit)
+                writer = None
+        finally:
+            if writer is not None:
+                writer.abort()
+            await response.aclose()
+
+    async def cached(self, url: str, variant: str = "") -> Optional[CachedMedia]:
+        """查找已缓存的文件（variant 为派生版本的参数），磁盘操作在线程中执行"""
+        if not config.MEDIA_CACHE_ENABLED:
+            return None
+        return await asyncio.to_thread(self.cache.get, self.cache.key(url, variant))
+
+    async def cache_writer(self, url: str, response: httpx.Response) -> Optional[MediaCacheWriter]:
+        """
+        为源站响应创建缓存写入器
+
+        缓存 200 响应以及范围覆盖整个文件的 206 响应（浏览器 <video> 总是带 Range: bytes=0-）；
+        部分范围、源站禁止缓存、声明的大小超过单个文件上限或无法创建缓存文件时返回 None
+        """
+        if not config.MEDIA_CACHE_ENABLED:
+            return None
+        if response.status_code == 206:
+            if not covers_whole(response.headers.get("content-range")):
+                return None
+        elif response.status_code != 200:
+            return None
+        if "no-store" in response.headers.get("cache-control", "").lower():
+            return None
+        length = response.headers.get("content-length")
+        if length and length.isdigit() and int(length) > self.cache.max_entry_bytes:
+            return None
+        content_type = response.headers.get("content-type", "application/octet-stream")
+        try:
+            return await asyncio.to_thread(
+                self.cache.open_writer, self.cache.key(url), url, content_type
+            )
+        except OSError as e:
+            # 缓存目录不可写（磁盘已满、权限不足）时只转发不缓存
+            logger.warning(f"创建媒体缓存失败，只转发不缓存: {url}, {str(e)}")
+            return None
+
+    async def open_file(self, entry: CachedMedia) -> Optional[BinaryIO]:
+        """打开缓存文件，文件已被淘汰时返回 None；已打开的文件不受之后的淘汰影响"""
+        try:
+            return await asyncio.to_thread(open, entry.path, "rb")
+        except OSError:
+            await asyncio.to_thread(self.cache.discard, entry.key)
+            return None
+
+    async def iter_file(self, f: BinaryIO, start: int, end: int) -> AsyncIterator[bytes]:
+        """按数据块读取已打开的缓存文件的 [start, end] 字节，读完后关闭"""
+        try:
+            await asyncio.to_thread(f.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(f.read, min(config.MEDIA_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    @staticmethod
+    def passthrough_headers(response: httpx.Response) -> dict:
+        """需要转发给客户端的源站响应头"""
+        headers = {}
+        # 响应体经过解压时长度会变化，只在未压缩时转发 Content-Length
+        if "content-length" in response.headers and "content-encoding" not in response.headers:
+            headers["Content-Length"] = response.headers["content-length"]
+        for name in ("Accept-Ranges", "Content-Range", "ETag", "Cache-Control", "Last-Modified"):
+            if name in response.headers:
+                headers[name] = response.headers[name]
+        return headers
+
+    async def read_source(self, url: str, headers: dict, limit: int) -> bytes:
+        """
+        读取完整的原图，优先使用磁盘缓存，未缓存时从源站下载并同时写入缓存
+
+        异常:
+            ValueError: 链接不支持
+            httpx.HTTPStatusError: 源站返回错误状态码
+            MediaTooLargeError: 原图超过 limit 字节
+        """
+        cached = await self.cached(url)
+        if cached is not None and cached.size <= limit:
+            f = await self.open_file(cached)
+            if f is not None:
+                try:
+                    return await asyncio.to_thread(f.read)
+                finally:
+                    f.close()
+
+        response = await self.open(url, headers)
+        if response.status_code >= 400:
+            await response.aclose()
+            response.raise_for_status()
+        length = response.headers.get("content-length")
+        if length and length.isdigit() and int(length) > limit:
+            await response.aclose()
+            raise MediaTooLargeError(f"文件大小 {length} 超过上限 {limit}")
+
+        data = bytearray()
+        body = self.iter_body(response, await self.cache_writer(url, response))
+        try:
+            async for chunk in body:
+                data += chunk
+                if len(data) > limit:
+                    raise MediaTooLargeError(f"文件大小超过上限 {limit}")
+        finally:
+            await body.aclose()
+        return bytes(data)
+
+    async def render(self, url: str, headers: dict, variant: ImageVariant) -> RenderedImage:
+        """
+        生成图片的派生版本（缩略图、格式转换）并写入缓存
+
+        相同版本的并发请求合并为一次；解码和编码在线程中执行，同时进行的转换数受配置限制
+
+        异常:
+            同 read_source，另有 UnsupportedImageError: 源文件无法作为图片转换
+        """
+        return await self.render_flight.do(
+            self.cache.key(url, variant.key), lambda: self._render(url, headers, variant)
+        )
+
+    async def _render(self, url: str, headers: dict, variant: ImageVariant) -> RenderedImage:
+        source = await self.read_source(url, headers, config.MEDIA_TRANSFORM_MAX_SOURCE_BYTES)
+        if self._render_semaphore is None:
+            self._render_semaphore = asyncio.Semaphore(config.MEDIA_TRANSFORM_CONCURRENCY)
+        async with self._render_semaphore:
+            data = await asyncio.to_thread(render_variant, source, variant)
+        logger.info(f"生成图片 {variant.key}: {len(source)} -> {len(data)} 字节 {url}")
+
+        if config.MEDIA_CACHE_ENABLED:
+            entry = await asyncio.to_thread(
+                self.cache.put, self.cache.key(url, variant.key), url, data, variant.content_type
+            )
+            if entry is not None:
+                return RenderedImage(data, variant.content_type, entry.etag)
+        return RenderedImage(data, variant.content_type, f'"{hashlib.sha256(data).hexdigest()[:32]}"')
@@ -0,0 +1,147 @@
+import datetime
+import decimal
+import json
+from contextvars import ContextVar
+from typing import Any, Mapping, Optional
+
+from fastapi.encoders import jsonable_encoder
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse
+
+# orjson 和 msgpack 为可选依赖：未安装 orjson 时退回标准库 json，未安装 msgpack 时不协商二进制编码
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+__all__ = [
+    "MSGPACK_MEDIA_TYPE",
+    "dumps_json",
+    "dumps_msgpack",
+    "CodecResponse",
+    "CodecMiddleware",
+]
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+# 客户端可能声明的 msgpack 媒体类型
+_MSGPACK_ACCEPT = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+
+# 当前请求的客户端是否接受 msgpack，由 CodecMiddleware 设置
+_accept_msgpack: ContextVar[bool] = ContextVar("accept_msgpack", default=False)
+
+
+def _default(obj: Any) -> Any:
+    """编码器不支持的类型，按 FastAPI 的 jsonable_encoder 规则转换"""
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if hasattr(obj, "tolist"):
+        # numpy 数组及标量
+        return obj.tolist()
+    return jsonable_encoder(obj)
+
+
+def dumps_json(content: Any) -> bytes:
+    """编码为 UTF-8 JSON，非 ASCII 字符不转义"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps_msgpack(content: Any) -> bytes:
+    """编码为 msgpack"""
+    return msgpack.packb(content, default=_default, datetime=False)
+
+
+def _quality(params: str) -> float:
+    """解析媒体类型参数中的 q 值，缺省或无法解析时为 1"""
+    for param in params.split(";"):
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return min(max(float(value.strip()), 0.0), 1.0)
+            except ValueError:
+                return 1.0
+    return 1.0
+
+
+def _accepts_msgpack(accept: str) -> bool:
+    """
+    按 q 值比较 msgpack 和 JSON，只有 msgpack 排名更高时才使用
+
+    排名为 (q 值, 是否明确列出)：同一 q 值下明确列出的类型优先于 */* 等通配符匹配；
+    两者排名相同时保持默认的 JSON
+    """
+    msgpack_rank = (0.0, 0)
+    json_rank = (0.0, 0)
+    for item in accept.split(","):
+        media_type, _, params = item.partition(";")
+        media_type = media_type.strip().lower()
+        q = _quality(params)
+        if media_type in _MSGPACK_ACCEPT:
+            msgpack_rank = max(msgpack_rank, (q, 1))
+        elif media_type == "application/json":
+            json_rank = max(json_rank, (q, 1))
+        elif media_type in ("*/*", "application/*"):
+            json_rank = max(json_rank, (q, 0))
+    # q=0 表示明确拒绝
+    return msgpack_rank[0] > 0 and msgpack_rank > json_rank
+
+
+class CodecResponse(JSONResponse):
+    """
+    应用的默认响应类
+
+    JSON 使用 orjson 编码；客户端在 Accept 中声明 application/msgpack 时改用 msgpack，
+    响应带 Vary: Accept，避免中间缓存把两种编码混用
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        if media_type is None and msgpack is not None:
+            headers = {**(headers or {}), "Vary": "Accept"}
+            if _accept_msgpack.get():
+                media_type = MSGPACK_MEDIA_TYPE
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        if self.media_type == MSGPACK_MEDIA_TYPE:
+            return dumps_msgpack(content)
+        return dumps_json(content)
+
+
+class CodecMiddleware:
+    """根据请求的 Accept 头决定响应编码"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for key, value in scope["headers"]:
+            if key == b"accept":
+                accept = value.decode("latin-1")
+                break
+        token = _accept_msgpack.set(msgpack is not None and _accepts_msgpack(accept))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _accept_msgpack.reset(token)
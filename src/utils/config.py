@@ -32,6 +32,89 @@ class BaseConfig:
     LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
     LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'logs')
     LOG_BACKUP_COUNT = 30
+
+    # 文件存储目录
+    STORAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'storage')
+
+    # 出站 HTTP 连接池配置
+    HTTP_TIMEOUT = 10.0                    # 请求总超时（秒）
+    HTTP_CONNECT_TIMEOUT = 5.0             # 建立连接超时（秒）
+    HTTP_MAX_CONNECTIONS = 200             # 连接池最大连接数
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = 50    # 最大保持空闲的长连接数
+    HTTP_KEEPALIVE_EXPIRY = 30.0           # 空闲长连接的存活时间（秒）
+    HTTP_MAX_CONNECTIONS_PER_HOST = 20     # 单个主机的最大并发请求数
+
+    # 媒体文件（图片、视频）代理的连接池配置，与页面抓取分开，长时间的视频下载不占用页面抓取的连接
+    MEDIA_MAX_CONNECTIONS = 200            # 连接池最大连接数
+    MEDIA_MAX_KEEPALIVE_CONNECTIONS = 50   # 最大保持空闲的长连接数
+    MEDIA_READ_TIMEOUT = 30.0              # 读取单个数据块的超时（秒），不限制整个文件的下载时间
+    MEDIA_CHUNK_SIZE = 64 * 1024           # 向客户端转发的数据块大小（字节）
+
+    # 出站请求的单主机限流与熔断配置，按平台域名计算，整个进程共享
+    # 速率与单主机并发数一致（每个连接每秒一个请求），同一平台的突发请求先排队等待，超过等待上限才返回 429
+    HOST_RATE_LIMIT = 20.0                 # 每秒补充的令牌数
+    HOST_RATE_BURST = 40                   # 允许的突发请求数
+    HOST_RATE_MAX_WAIT = 5.0               # 等待令牌的最长时间（秒），超过时直接拒绝
+    CIRCUIT_FAILURE_THRESHOLD = 5          # 连续失败多少次后熔断
+    CIRCUIT_RECOVERY_TIMEOUT = 30.0        # 熔断后多久（秒）放行探测请求
+
+    # 解析结果缓存配置
+    ANALYZE_CACHE_MAX_SIZE = 2048          # 最多缓存的作品数
+    ANALYZE_CACHE_DEFAULT_TTL = 300        # 默认过期时间（秒）
+    # 各平台的过期时间（秒），视频直链有时效，抖音/快手设置得短一些
+    ANALYZE_CACHE_TTL = {
+        "xiaohongshu": 600,
+        "douyin": 300,
+        "kuaishou": 300,
+        "weibo": 600,
+    }
+
+    # 失效链接的负缓存配置
+    NEGATIVE_CACHE_MAX_SIZE = 4096             # 最大条目数
+    NEGATIVE_CACHE_TTL = 120                   # 过期时间（秒），作品可能恢复，不宜过长
+
+    # 批量解析配置
+    ANALYZE_BATCH_MAX_SIZE = 50                # 单次批量解析的最大链接数
+    ANALYZE_BATCH_STREAM_MAX_SIZE = 500        # 流式批量解析的最大链接数
+    ANALYZE_BATCH_CONCURRENCY = 10             # 单次批量解析的最大并发数
+    ANALYZE_BATCH_PER_HOST_CONCURRENCY = 4     # 单次批量解析中同一主机的最大并发数
+
+    # 异步解析任务配置
+    ANALYZE_JOB_WORKERS = 8                    # 后台 worker 数
+    ANALYZE_JOB_QUEUE_SIZE = 200               # 排队任务上限，队列满时拒绝新任务
+    ANALYZE_JOB_RETENTION = 600                # 已完成任务的保留时间（秒）
+
+    # 短链解析缓存配置
+    SHORT_LINK_HOSTS = ("xhslink.com", "v.douyin.com", "v.kuaishou.com", "t.cn")
+    SHORT_LINK_CACHE_MAX_SIZE = 10000      # 最多缓存的短链数
+    SHORT_LINK_CACHE_TTL = 6 * 3600        # 过期时间（秒），最终链接中的 token 会失效，不宜过长
+    SHORT_LINK_CACHE_PERSIST = True        # 是否持久化到 storage/ 目录
+    SHORT_LINK_CACHE_FILE = os.path.join(STORAGE_DIR, 'short_links.json')
+
+    # 流式获取页面，读到内嵌状态脚本后即停止下载
+    STREAM_EARLY_STOP = True
+
+    # 页面快照配置
+    SNAPSHOT_ENABLED = True                                  # 是否将抓取的页面 HTML 保存到磁盘
+    SNAPSHOT_DIR = os.path.join(STORAGE_DIR, 'snapshots')    # 快照目录
+    SNAPSHOT_TTL = 600                                       # 快照有效期上限（秒），各平台不超过其解析结果缓存时间
+    SNAPSHOT_MAX_BYTES = 256 * 1024 * 1024                   # 快照总大小上限（压缩后），超出按最近访问淘汰
+    SNAPSHOT_INDEX_FLUSH_INTERVAL = 30                       # 索引写入磁盘的最短间隔（秒），关闭时再写入一次
+
+    # 媒体文件（图片、视频）磁盘缓存配置
+    MEDIA_CACHE_ENABLED = True                                    # 是否缓存代理过的图片和视频
+    MEDIA_CACHE_DIR = os.path.join(STORAGE_DIR, 'media')          # 缓存目录
+    MEDIA_CACHE_TTL = 24 * 3600                                   # 缓存有效期（秒）
+    MEDIA_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024                # 缓存总大小上限，超出按最近访问淘汰
+    MEDIA_CACHE_MAX_ENTRY_BYTES = 64 * 1024 * 1024                # 单个文件的大小上限，更大的文件只转发不缓存
+
+    # 图片代理的缩略图与格式转换配置
+    MEDIA_TRANSFORM_MAX_DIMENSION = 2048                          # 缩略图宽、高的上限（像素）
+    MEDIA_TRANSFORM_DEFAULT_QUALITY = 80                          # 未指定 q 时的编码质量
+    MEDIA_TRANSFORM_MAX_SOURCE_BYTES = 32 * 1024 * 1024           # 原图的大小上限，更大的图片不做转换
+    MEDIA_TRANSFORM_MAX_PIXELS = 64 * 1024 * 1024                 # 原图的像素数上限，防止解压炸弹
+    MEDIA_TRANSFORM_CONCURRENCY = 4                               # 同时进行的图片转换数，避免占满线程池和 CPU
+
     # 关键词映射
     APP_TYPE_KEYWORD = {
         "xiaohongshu": ['小红书', 'xhs','xiaohongshu'],
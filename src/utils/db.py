@@ -3,6 +3,7 @@ from dbutils.pooled_db import PooledDB
 import configparser
 import os
 from src.utils import get_db_logger
+from src.utils.metrics import MetricFamily, register_collector
 from typing import Optional, Any, List, Dict
 
 logger = get_db_logger()
@@ -93,6 +94,34 @@ class DatabasePool:
         """检查数据库是否已正确配置"""
         return cls._config_valid
 
+    def stats(self) -> dict:
+        """返回连接池使用情况，PooledDB 未提供公开接口，读取其内部计数"""
+        pool = getattr(self, "pool", None)
+        if pool is None:
+            return {"in_use": 0, "idle": 0, "max_connections": 0}
+        return {
+            "in_use": pool._connections,
+            "idle": len(pool._idle_cache),
+            "max_connections": pool._maxconnections,
+        }
+
+
+def _collect_pool_metrics():
+    # 未创建过连接池时不主动初始化，避免抓取指标触发数据库连接
+    if DatabasePool._instance is None or not DatabasePool.is_configured():
+        return []
+    stats = DatabasePool._instance.stats()
+    return [
+        MetricFamily("db_pool_connections", "gauge", "数据库连接池的连接数")
+        .add(stats["in_use"], state="in_use")
+        .add(stats["idle"], state="idle"),
+        MetricFamily("db_pool_max_connections", "gauge", "数据库连接池允许的最大连接数")
+        .add(stats["max_connections"]),
+    ]
+
+
+register_collector(_collect_pool_metrics)
+
 class DatabaseConnection:
     def __init__(self):
         self.pool = DatabasePool()
@@ -0,0 +1,38 @@
+class LinkUnavailableError(ValueError):
+    """
+    链接指向的作品已删除或不存在
+
+    与网络错误等临时失败不同，短时间内重试结果不会改变，可以进行负缓存
+    """
+
+    def __init__(self, message: str, url: str = ""):
+        super().__init__(message)
+        self.url = url
+
+
+class RateLimitedError(RuntimeError):
+    """出站请求超过主机的限流速率，对应 HTTP 429，retry_after 为建议的重试等待秒数"""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(RuntimeError):
+    """主机的熔断器处于断开状态，请求直接失败"""
+
+
+class RangeNotSatisfiableError(ValueError):
+    """请求的字节范围超出文件大小，对应 HTTP 416"""
+
+    def __init__(self, size: int):
+        super().__init__(f"请求范围超出文件大小 {size}")
+        self.size = size
+
+
+class UnsupportedImageError(ValueError):
+    """源文件无法作为图片解码，或尺寸超过转换上限，对应 HTTP 415"""
+
+
+class MediaTooLargeError(ValueError):
+    """源文件超过允许读入内存的大小，对应 HTTP 413"""
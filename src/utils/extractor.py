@@ -0,0 +1,146 @@
+import html as html_lib
+import re
+from typing import Callable, Optional
+
+__all__ = ["PageExtractor", "find_script", "find_title", "find_meta", "state_ready"]
+
+_TITLE_RE = re.compile(r"<title\b[^>]*>(.*?)</title\s*>", re.S | re.I)
+# 属性值中的 > 不结束标签，如 content="a > b"
+_META_RE = re.compile(r"""<meta\b(?:[^>"']|"[^"]*"|'[^']*')*>""", re.I)
+_HEAD_END_RE = re.compile(r"</head\s*>", re.I)
+_ATTR_RE = re.compile(r"""([\w:.-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+
+def _script_marker(html: str, marker: str, start: int = 0) -> int:
+    """返回 start 之后第一个位于 <script> 内的 marker 的位置，未找到时返回 -1"""
+    pos = html.find(marker, start)
+    while pos != -1:
+        open_pos = html.rfind("<script", 0, pos)
+        # marker 必须位于一个尚未闭合的 <script> 内
+        if open_pos != -1 and html.rfind("</script", open_pos, pos) == -1:
+            if html.find(">", open_pos, pos) != -1:
+                return pos
+        pos = html.find(marker, pos + len(marker))
+    return -1
+
+
+def find_script(html: str, marker: str) -> Optional[str]:
+    """
+    直接在原始 HTML 中定位包含 marker 的 <script> 内容，不构建 DOM
+
+    参数:
+        html: 页面 HTML
+        marker: 脚本中的标识，如 "window.__INITIAL_STATE__"
+
+    返回:
+        脚本内容（不含标签），未找到时返回 None
+    """
+    pos = _script_marker(html, marker)
+    if pos == -1:
+        return None
+    content_start = html.find(">", html.rfind("<script", 0, pos), pos) + 1
+    end = html.find("</script", pos)
+    return html[content_start:end] if end != -1 else None
+
+
+def find_title(html: str) -> Optional[str]:
+    """提取 <title> 文本，未找到时返回 None"""
+    match = _TITLE_RE.search(html)
+    return html_lib.unescape(match.group(1)) if match else None
+
+
+def find_meta(html: str, name: Optional[str] = None, property: Optional[str] = None) -> Optional[str]:
+    """提取 name 或 property 匹配的 <meta> 的 content，未找到或 content 为空时返回 None"""
+    for match in _META_RE.finditer(html):
+        attrs = {
+            # findall 中未参与匹配的分组为空字符串，取实际匹配的那种引号写法
+            key.lower(): next((v for v in values if v), "")
+            for key, *values in _ATTR_RE.findall(match.group(0))
+        }
+        if (name and attrs.get("name") == name) or (property and attrs.get("property") == property):
+            if attrs.get("content"):
+                return html_lib.unescape(attrs["content"])
+    return None
+
+
+def state_ready(marker: str) -> Callable[[str], bool]:
+    """
+    生成流式下载的停止条件：<head> 已结束（title、meta 已读到），
+    且包含 marker 的脚本已完整读取
+
+    返回的函数每次收到完整的已读取文本，但只扫描上次之后新增的部分（保留少量重叠，
+    避免标记跨越数据块），整个下载过程的扫描量与页面大小成正比
+    """
+    closing = "</script"
+    overlap = max(len(marker), len(closing), 16)
+    state = {"scanned": 0, "head": False, "marker": -1, "closed": False}
+
+    def ready(html: str) -> bool:
+        start = max(state["scanned"] - overlap, 0)
+        state["scanned"] = len(html)
+        if not state["head"]:
+            state["head"] = _HEAD_END_RE.search(html, start) is not None
+        if state["marker"] == -1:
+            # 已读取部分中不在脚本内的 marker 之后也不会变，只需从新增部分查找
+            state["marker"] = _script_marker(html, marker, start)
+            if state["marker"] == -1:
+                return False
+            start = state["marker"]
+        if not state["closed"]:
+            state["closed"] = html.find(closing, max(start, state["marker"])) != -1
+        return state["head"] and state["closed"]
+
+    return ready
+
+
+class PageExtractor:
+    """
+    页面关键信息提取
+
+    优先直接在原始文本中定位状态脚本和 meta 信息，
+    只有快速路径找不到脚本时才退回 BeautifulSoup 解析整页
+    """
+
+    def __init__(self, html: str):
+        self.html = html
+        self._soup = None
+        self._scripts = {}
+
+    @property
+    def soup(self):
+        """按需构建的 BeautifulSoup 对象"""
+        if self._soup is None:
+            from bs4 import BeautifulSoup
+            self._soup = BeautifulSoup(self.html, "html.parser")
+        return self._soup
+
+    def script(self, marker: str) -> Optional[str]:
+        """获取包含 marker 的脚本内容，结果按 marker 缓存"""
+        if marker not in self._scripts:
+            self._scripts[marker] = self._find_script(marker)
+        return self._scripts[marker]
+
+    def _find_script(self, marker: str) -> Optional[str]:
+        text = find_script(self.html, marker)
+        if text is not None:
+            return text
+        for script in self.soup.find_all("script"):
+            if script.string and marker in script.string:
+                return script.string
+        return None
+
+    def title(self) -> str:
+        """获取页面标题"""
+        title = find_title(self.html)
+        if title is None and self._soup is not None and self._soup.title:
+            title = self._soup.title.text
+        return title or ""
+
+    def meta(self, name: Optional[str] = None, property: Optional[str] = None) -> str:
+        """获取 meta 的 content，快速路径找不到或 content 为空时退回 BeautifulSoup"""
+        content = find_meta(self.html, name=name, property=property)
+        if content is None:
+            attrs = {"name": name} if name else {"property": property}
+            tag = self.soup.find("meta", attrs=attrs)
+            content = tag.get("content", "") if tag else None
+        return content or ""
@@ -0,0 +1,163 @@
+import asyncio
+import time
+from typing import Dict
+
+from .config import config
+from .errors import CircuitOpenError, RateLimitedError
+
+__all__ = ["TokenBucket", "CircuitBreaker", "HostGuard", "get_host_guard", "host_guard_stats"]
+
+
+class TokenBucket:
+    """
+    令牌桶限流
+
+    按固定速率补充令牌，允许不超过 burst 的突发；令牌不足时等待，
+    需要等待的时间超过 max_wait 时直接拒绝，避免请求堆积
+    """
+
+    def __init__(self, rate: float, burst: int, max_wait: float):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self.throttled = 0
+        self.rejected = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """获取一个令牌，需要等待过久时抛出 RateLimitedError"""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return
+        wait = (1 - self._tokens) / self.rate
+        if wait > self.max_wait:
+            self.rejected += 1
+            raise RateLimitedError(f"请求过于频繁，需等待 {wait:.1f} 秒", wait)
+        # 先预占令牌，之后到达的请求按顺序排在后面
+        self._tokens -= 1
+        self.throttled += 1
+        await asyncio.sleep(wait)
+
+    def stats(self) -> dict:
+        self._refill()
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 2),
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败达到阈值后断开，断开期间直接失败；
+    超过恢复时间后进入半开状态，只放行一个探测请求，成功则闭合，失败则重新断开
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+        self.short_circuited = 0
+
+    def before_call(self):
+        """请求前检查，断开时抛出 CircuitOpenError"""
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.recovery_timeout - time.monotonic()
+            if remaining > 0:
+                self.short_circuited += 1
+                raise CircuitOpenError(f"熔断中，{remaining:.0f} 秒后重试")
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                self.short_circuited += 1
+                raise CircuitOpenError("熔断恢复探测中")
+            self._probing = True
+
+    def release(self):
+        """请求未真正发出时调用，半开状态下让出探测名额"""
+        self._probing = False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class HostGuard:
+    """单个主机的限流与熔断"""
+
+    def __init__(self):
+        self.bucket = TokenBucket(
+            rate=config.HOST_RATE_LIMIT,
+            burst=config.HOST_RATE_BURST,
+            max_wait=config.HOST_RATE_MAX_WAIT,
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_timeout=config.CIRCUIT_RECOVERY_TIMEOUT,
+        )
+
+    async def acquire(self):
+        """请求前调用：熔断检查后再获取令牌"""
+        self.breaker.before_call()
+        try:
+            await self.bucket.acquire()
+        except (RateLimitedError, asyncio.CancelledError):
+            self.breaker.release()
+            raise
+
+    def stats(self) -> dict:
+        return {"breaker": self.breaker.stats(), "rate_limit": self.bucket.stats()}
+
+
+_guards: Dict[str, HostGuard] = {}
+
+
+def get_host_guard(host: str) -> HostGuard:
+    """获取主机对应的限流熔断器，host 应为 http_client.host_bucket 的分组，避免任意主机名让字典无限增长"""
+    guard = _guards.get(host)
+    if guard is None:
+        guard = HostGuard()
+        _guards[host] = guard
+    return guard
+
+
+def host_guard_stats() -> Dict[str, dict]:
+    """返回所有主机的熔断状态与限流统计"""
+    return {host: guard.stats() for host, guard in _guards.items()}
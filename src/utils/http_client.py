@@ -0,0 +1,215 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from src.app.registry import match_domain
+
+from .config import config
+from .host_guard import get_host_guard
+from .logger import get_utils_logger
+from .metrics import fetch_duration
+from .short_link import short_link_cache
+
+__all__ = [
+    "init_http_client",
+    "close_http_client",
+    "get_http_client",
+    "get_media_client",
+    "fetch",
+    "fetch_until",
+    "host_bucket",
+]
+
+logger = get_utils_logger()
+
+# 进程级共享的异步客户端，在应用启动时创建，关闭时释放
+_client: Optional[httpx.AsyncClient] = None
+# 媒体文件代理使用的客户端，按需创建
+_media_client: Optional[httpx.AsyncClient] = None
+# init_http_client 指定的自定义传输层，媒体客户端同样使用
+_transport: Optional[httpx.AsyncBaseTransport] = None
+# 每个主机的并发连接限制
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+# 未注册平台的主机共用的分组
+OTHER_HOSTS = "other"
+
+
+def _create_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """创建带连接池和 keep-alive 的异步客户端"""
+    limits = httpx.Limits(
+        max_connections=config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(config.HTTP_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT)
+    return httpx.AsyncClient(
+        limits=limits, timeout=timeout, follow_redirects=True, transport=transport
+    )
+
+
+def init_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    应用启动时创建共享客户端
+
+    参数:
+        transport: 自定义传输层，如离线基准测试中把请求转发到本地回放服务
+    """
+    global _client, _transport
+    if _client is None or _client.is_closed:
+        _transport = transport
+        _client = _create_client(transport)
+        logger.info(
+            f"共享 HTTP 客户端已创建 - 最大连接数: {config.HTTP_MAX_CONNECTIONS}, "
+            f"单主机并发: {config.HTTP_MAX_CONNECTIONS_PER_HOST}"
+        )
+    return _client
+
+
+async def close_http_client():
+    """应用关闭时释放共享客户端的所有连接"""
+    global _client, _media_client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("共享 HTTP 客户端已关闭")
+    if _media_client is not None and not _media_client.is_closed:
+        await _media_client.aclose()
+    _client = None
+    _media_client = None
+    _host_semaphores.clear()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """获取共享客户端，未初始化时（如脚本中直接调用）按需创建"""
+    if _client is None or _client.is_closed:
+        return init_http_client()
+    return _client
+
+
+def get_media_client() -> httpx.AsyncClient:
+    """
+    获取媒体文件代理的共享客户端
+
+    与页面抓取的客户端分开建池，同一 CDN 的请求复用长连接；
+    只限制建立连接和读取单个数据块的时间，大文件可以持续下载
+    """
+    global _media_client
+    if _media_client is None or _media_client.is_closed:
+        limits = httpx.Limits(
+            max_connections=config.MEDIA_MAX_CONNECTIONS,
+            max_keepalive_connections=config.MEDIA_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(config.MEDIA_READ_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT)
+        _media_client = httpx.AsyncClient(
+            limits=limits, timeout=timeout, follow_redirects=True, transport=_transport
+        )
+    return _media_client
+
+
+def host_bucket(host: str) -> str:
+    """
+    主机所属的分组：已注册平台的主机按平台域名分组，其余主机都归入 other
+
+    限流熔断、并发限制和指标标签都按分组保存，任意链接都不会让这些状态无限增长
+    """
+    return match_domain(host) or OTHER_HOSTS
+
+
+def _get_host_semaphore(host: str) -> asyncio.Semaphore:
+    """获取主机对应的并发信号量"""
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(config.HTTP_MAX_CONNECTIONS_PER_HOST)
+        _host_semaphores[host] = semaphore
+    return semaphore
+
+
+async def _guarded(url: str, send: Callable[[httpx.AsyncClient, str], Awaitable[Tuple[httpx.Response, Any]]]):
+    """
+    经过短链缓存、主机限流熔断和并发限制执行请求
+
+    短链命中缓存时直接请求最终链接，跳过重定向（解析结果由调用方在页面成功解析后记录）；
+    熔断期间直接抛出 CircuitOpenError，超时、连接错误、429 和 5xx 响应计为失败
+    """
+    target = short_link_cache.resolve(url) or url
+    host = host_bucket(urlparse(target).hostname or "")
+    guard = get_host_guard(host)
+    await guard.acquire()
+    start = time.perf_counter()
+    try:
+        async with _get_host_semaphore(host):
+            response, body = await send(get_http_client(), target)
+    except httpx.TransportError:
+        guard.breaker.record_failure()
+        fetch_duration.observe((time.perf_counter() - start) * 1000, host, "error")
+        raise
+    except BaseException:
+        guard.breaker.release()
+        raise
+    fetch_duration.observe((time.perf_counter() - start) * 1000, host, f"{response.status_code // 100}xx")
+    if response.status_code == 429 or response.status_code >= 500:
+        guard.breaker.record_failure()
+        if guard.breaker.state == guard.breaker.OPEN:
+            logger.warning(f"主机 {host} 已熔断: {response.status_code}")
+    else:
+        guard.breaker.record_success()
+    return response, body
+
+
+async def fetch(url: str, headers: Optional[dict] = None) -> httpx.Response:
+    """
+    通过共享客户端异步获取页面，自动跟随重定向
+
+    参数:
+        url: 请求地址
+        headers: 请求头
+
+    返回:
+        httpx.Response 对象
+    """
+
+    async def send(client: httpx.AsyncClient, target: str):
+        return await client.get(target, headers=headers), None
+
+    response, _ = await _guarded(url, send)
+    return response
+
+
+async def fetch_until(
+    url: str, headers: Optional[dict], until: Callable[[str], bool]
+) -> Tuple[httpx.Response, str, bool]:
+    """
+    流式获取页面，已读取的内容满足 until 时立即停止并关闭连接
+
+    适用于只需要页面前部（如 <head> 和内嵌状态脚本）的场景，
+    大页面可以省去后半部分的传输和解码
+
+    参数:
+        url: 请求地址
+        headers: 请求头
+        until: 判断已读取的文本是否足够的函数
+
+    返回:
+        (响应对象, 已读取的文本, 是否读取了完整页面)
+    """
+
+    async def send(client: httpx.AsyncClient, target: str):
+        request = client.build_request("GET", target, headers=headers)
+        response = await client.send(request, stream=True)
+        text = ""
+        complete = True
+        try:
+            async for chunk in response.aiter_text():
+                text += chunk
+                if until(text):
+                    complete = False
+                    break
+        finally:
+            await response.aclose()
+        return response, (text, complete)
+
+    response, (text, complete) = await _guarded(url, send)
+    return response, text, complete
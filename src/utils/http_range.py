@@ -0,0 +1,72 @@
+from typing import Optional, Tuple
+
+from .errors import RangeNotSatisfiableError
+
+__all__ = ["parse_range", "content_range", "covers_whole", "etag_matches"]
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析 Range 请求头中的单个字节范围
+
+    参数:
+        header: Range 请求头，如 "bytes=0-1023"、"bytes=1024-"、"bytes=-500"
+        size: 文件大小
+
+    返回:
+        (起始, 结束) 闭区间；没有 Range、格式无法识别或包含多个范围时返回 None，按完整文件处理；
+        范围与文件没有交集时抛出 RangeNotSatisfiableError
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    first, last = first.strip(), last.strip()
+    if not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if first:
+        start = int(first)
+        end = int(last) if last else size - 1
+        if last and end < start:
+            return None
+    else:
+        # 后缀范围：最后 N 个字节
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiableError(size)
+        start, end = max(size - length, 0), size - 1
+    if start >= size:
+        raise RangeNotSatisfiableError(size)
+    return start, min(end, size - 1)
+
+
+def content_range(start: int, end: int, size: int) -> str:
+    """生成 206 响应的 Content-Range"""
+    return f"bytes {start}-{end}/{size}"
+
+
+def covers_whole(header: Optional[str]) -> bool:
+    """206 响应的 Content-Range 是否覆盖整个文件，如浏览器 <video> 请求 bytes=0- 得到的 bytes 0-999/1000"""
+    if not header:
+        return False
+    unit, _, spec = header.strip().partition(" ")
+    span, _, size = spec.partition("/")
+    first, _, last = span.partition("-")
+    if unit.lower() != "bytes" or not (first.isdigit() and last.isdigit() and size.isdigit()):
+        return False
+    return int(first) == 0 and int(last) == int(size) - 1
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match 中是否包含当前 ETag，按弱比较（忽略 W/ 前缀），* 匹配任意值"""
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
@@ -0,0 +1,146 @@
+import io
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from .config import config
+from .errors import UnsupportedImageError
+
+__all__ = ["ImageVariant", "render_variant", "FORMATS"]
+
+# 支持输出的格式：参数名 -> (Pillow 格式, Content-Type)
+FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+_FORMAT_ALIASES = {"jpg": "jpeg"}
+
+# EXIF 方向为 5-8 时图片需要旋转 90 度，宽高互换
+_ORIENTATION_TAG = 0x0112
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+@dataclass(frozen=True)
+class ImageVariant:
+    """
+    图片的派生版本：缩放到 width x height 以内并转换为 fmt 格式
+
+    只指定宽或高时按比例缩放；不放大小于目标尺寸的图片
+    """
+
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fmt: str = "webp"
+    quality: int = config.MEDIA_TRANSFORM_DEFAULT_QUALITY
+
+    @classmethod
+    def from_params(
+        cls, width: Optional[int], height: Optional[int], fmt: Optional[str], quality: Optional[int]
+    ) -> Optional["ImageVariant"]:
+        """
+        由查询参数构造，参数都未指定时返回 None（返回原图）
+
+        异常:
+            ValueError: 参数超出范围或格式不支持
+        """
+        if width is None and height is None and fmt is None and quality is None:
+            return None
+        for name, value in (("w", width), ("h", height)):
+            if value is not None and not 1 <= value <= config.MEDIA_TRANSFORM_MAX_DIMENSION:
+                raise ValueError(f"{name} 需在 1-{config.MEDIA_TRANSFORM_MAX_DIMENSION} 之间")
+        if quality is not None and not 1 <= quality <= 100:
+            raise ValueError("q 需在 1-100 之间")
+        fmt = (fmt or "webp").lower()
+        fmt = _FORMAT_ALIASES.get(fmt, fmt)
+        if fmt not in FORMATS:
+            raise ValueError(f"不支持的格式: {fmt}，可选 {', '.join(FORMATS)}")
+        return cls(
+            width=width,
+            height=height,
+            fmt=fmt,
+            quality=quality if quality is not None else config.MEDIA_TRANSFORM_DEFAULT_QUALITY,
+        )
+
+    @property
+    def key(self) -> str:
+        """用于缓存键的规范化参数，同一版本的不同写法（如 jpg/jpeg）得到相同的键"""
+        return f"w={self.width or ''}&h={self.height or ''}&fmt={self.fmt}&q={self.quality}"
+
+    @property
+    def content_type(self) -> str:
+        return FORMATS[self.fmt][1]
+
+    def target_size(self, size: Tuple[int, int]) -> Tuple[int, int]:
+        """按比例缩放到目标尺寸以内，不放大"""
+        width, height = size
+        scale = 1.0
+        if self.width is not None:
+            scale = min(scale, self.width / width)
+        if self.height is not None:
+            scale = min(scale, self.height / height)
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _flatten(image: Image.Image, fmt: str) -> Image.Image:
+    """转换为目标格式支持的色彩模式，JPEG 不支持透明通道，透明部分填充白色"""
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    if fmt == "jpeg":
+        if has_alpha:
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        return image if image.mode in ("RGB", "L") else image.convert("RGB")
+    if has_alpha:
+        return image if image.mode == "RGBA" else image.convert("RGBA")
+    return image if image.mode in ("RGB", "L") else image.convert("RGB")
+
+
+def render_variant(data: bytes, variant: ImageVariant) -> bytes:
+    """
+    生成图片的派生版本，CPU 密集，应在线程中调用
+
+    参数:
+        data: 原图内容
+        variant: 目标尺寸和格式
+
+    返回:
+        编码后的图片内容
+
+    异常:
+        UnsupportedImageError: 无法解码或像素数超过上限
+    """
+    try:
+        # 动图只取第一帧
+        with Image.open(io.BytesIO(data)) as image:
+            width, height = image.size
+            if width * height > config.MEDIA_TRANSFORM_MAX_PIXELS:
+                raise UnsupportedImageError(f"图片尺寸过大: {width}x{height}")
+            transposed = image.getexif().get(_ORIENTATION_TAG) in _TRANSPOSED_ORIENTATIONS
+            oriented = (height, width) if transposed else (width, height)
+            target = variant.target_size(oriented)
+            if image.format == "JPEG":
+                # JPEG 解码时直接按 1/2、1/4、1/8 缩小，大图生成缩略图的耗时和内存显著降低
+                image.draft("RGB", (target[1], target[0]) if transposed else target)
+            image = ImageOps.exif_transpose(image)
+            if image.size != target:
+                image = image.resize(target, Image.LANCZOS, reducing_gap=3.0)
+            image = _flatten(image, variant.fmt)
+
+            output = io.BytesIO()
+            pil_format = FORMATS[variant.fmt][0]
+            if variant.fmt == "webp":
+                image.save(output, pil_format, quality=variant.quality, method=4)
+            elif variant.fmt == "jpeg":
+                image.save(output, pil_format, quality=variant.quality, optimize=True, progressive=True)
+            else:
+                image.save(output, pil_format, optimize=True)
+            return output.getvalue()
+    except UnsupportedImageError:
+        raise
+    except Image.UnidentifiedImageError as e:
+        raise UnsupportedImageError("无法识别的图片格式") from e
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise UnsupportedImageError(f"无法转换图片: {e}") from e
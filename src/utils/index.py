@@ -1,12 +1,17 @@
 import re
-from typing import Optional
+from typing import List, Optional
 from .logger import get_utils_logger
 
-__all__ = ["find_url"]
+__all__ = ["find_url", "find_urls"]
 
 # 获取工具模块的日志器
 logger = get_utils_logger()
 
+# 文本中的 URL，以空白或中英文逗号结束
+URL_PATTERN = re.compile(r"https?://[^\s,，]+")
+# URL 末尾可能粘连的标点符号
+TRAILING_PUNCTUATION = re.compile(r"[.,;:!?)]+$")
+
 def find_url(string: str) -> Optional[str]:
     """
     从文本中提取 URL
@@ -24,15 +29,10 @@ def find_url(string: str) -> Optional[str]:
             return string
             
         # 否则在文本中查找 URL
-        # 将中文逗号替换为空格，以便更好地分隔
-        tmp = string.replace("，", " ").replace(",", " ")
-        
-        # 查找 URL
-        match = re.search(r"(?P<url>https?://[^\s]+)", tmp)
+        match = URL_PATTERN.search(string)
         if match:
-            url = match.group("url")
             # 移除 URL 末尾可能的标点符号
-            url = re.sub(r'[.,;:!?)]+$', '', url)
+            url = TRAILING_PUNCTUATION.sub('', match.group())
             logger.info(f"从文本中提取到URL: {url}")
             return url
         
@@ -40,4 +40,22 @@ def find_url(string: str) -> Optional[str]:
         return None
     except Exception as e:
         logger.error(f"提取 URL 时出错: {str(e)}", exc_info=True)
-        return None
\ No newline at end of file
+        return None
+
+
+def find_urls(string: str) -> List[str]:
+    """
+    提取文本中的所有 URL
+
+    参数:
+        string: 可能包含多个链接的文本
+
+    返回:
+        去重后的 URL 列表，保持在文本中出现的顺序
+    """
+    urls = []
+    for match in URL_PATTERN.finditer(string):
+        url = TRAILING_PUNCTUATION.sub('', match.group())
+        if url not in urls:
+            urls.append(url)
+    return urls
@@ -0,0 +1,161 @@
+import json
+import re
+from typing import Any, Optional
+
+__all__ = ["KeyNotFoundError", "find_key", "decode_value", "decode_key", "decode_nth_member"]
+
+_decoder = json.JSONDecoder()
+
+# JSON 字符串（处理转义）
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+# 括号之外、可整段跳过的内容：普通字符或完整字符串
+_NON_BRACKET_RUN = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+# 字符串之外的 undefined 字面量
+_UNDEFINED = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|\bundefined\b')
+_WHITESPACE = re.compile(r"\s*")
+_LITERAL = re.compile(r"[^,:\[\]{}\s]*")
+_COLON = re.compile(r"\s*:\s*")
+
+# decode_key、decode_nth_member 未指定默认值的标记
+_MISSING = object()
+
+
+class KeyNotFoundError(ValueError):
+    """
+    文本中找不到要解码的成员
+
+    键名可能经过了 find_key 未处理的转义，找不到不代表数据中不存在，调用方应退回整体解码
+    """
+
+
+def _value_end(text: str, pos: int) -> int:
+    """返回从 pos 开始的值的结束位置（不解码）"""
+    if text[pos] == '"':
+        return _STRING.match(text, pos).end()
+    if text[pos] not in "{[":
+        return _LITERAL.match(text, pos).end()
+    depth = 0
+    length = len(text)
+    while True:
+        pos = _NON_BRACKET_RUN.match(text, pos).end()
+        if pos >= length:
+            raise ValueError("JSON 括号不匹配")
+        if text[pos] in "{[":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+
+
+def find_key(text: str, key: str, start: int = 0) -> Optional[int]:
+    """
+    在不解码的情况下定位唯一的成员键
+
+    合法 JSON 中字符串内的引号都会被转义，"键": 只会出现在对象成员位置，
+    因此只要该键在 start 之后只出现一次，就可以直接定位而无需逐层计算括号深度；
+    页面内嵌的状态通常把 "/" 转义为 \\u002F（如 "video_(id)\\u002Fpage"），两种写法都会查找
+
+    参数:
+        text: JSON 文本
+        key: 成员名
+        start: 查找起始位置
+
+    返回:
+        成员值的起始位置，不存在时返回 None；键名出现多次时抛出 ValueError
+    """
+    needle = json.dumps(key, ensure_ascii=False)
+    needles = {needle, needle.replace("/", "\\u002F")}
+    found = None
+    for candidate in needles:
+        pos = text.find(candidate, start)
+        while pos != -1:
+            # 与键名相同的字符串值后面不会跟冒号，跳过
+            match = _COLON.match(text, pos + len(candidate))
+            if match:
+                if found is not None:
+                    raise ValueError(f"键 {needle} 出现多次，无法直接定位")
+                found = match.end()
+            pos = text.find(candidate, pos + len(candidate))
+    return found
+
+
+def decode_value(text: str, pos: int) -> Any:
+    """
+    只解码从 pos 开始的一个值
+
+    合法 JSON 直接用 raw_decode 在 C 层解码并在值结束处停止；
+    含 undefined 等 JS 字面量时，先定位值的范围，只在该范围内替换为 null 再解码
+    """
+    try:
+        return _decoder.raw_decode(text, pos)[0]
+    except json.JSONDecodeError:
+        if text.startswith("undefined", pos):
+            return None
+        if text[pos] not in "{[":
+            raise
+        fragment = text[pos:_value_end(text, pos)]
+        fragment = _UNDEFINED.sub(lambda m: "null" if m.group(0) == "undefined" else m.group(0), fragment)
+        return json.loads(fragment)
+
+
+def decode_key(text: str, key: str, start: int = 0, default: Any = _MISSING) -> Any:
+    """
+    定位唯一的成员键并只解码其值
+
+    参数:
+        text: JSON 文本（可带有赋值语句等前缀）
+        key: 成员名，如 "noteDetailMap"
+        start: 查找起始位置
+        default: 键不存在时的返回值，未指定时抛出 KeyNotFoundError
+
+    返回:
+        解码后的子树
+    """
+    pos = find_key(text, key, start)
+    if pos is None:
+        if default is _MISSING:
+            raise KeyNotFoundError(f"找不到键 {key}")
+        return default
+    return decode_value(text, pos)
+
+
+def _missing_member(n: int, default: Any) -> Any:
+    if default is _MISSING:
+        raise KeyNotFoundError(f"找不到第 {n + 1} 个成员")
+    return default
+
+
+def decode_nth_member(text: str, n: int, start: Optional[int] = None, default: Any = _MISSING) -> Any:
+    """
+    解码对象的第 n 个（从 0 开始）成员值，之后的成员不再解析
+
+    参数:
+        text: JSON 文本
+        n: 成员序号
+        start: 对象起始位置，默认取第一个 "{"
+        default: 成员数量不足时的返回值，未指定时抛出 KeyNotFoundError
+    """
+    pos = text.index("{") if start is None else start
+    pos = _WHITESPACE.match(text, pos + 1).end()
+    for index in range(n + 1):
+        key = _STRING.match(text, pos)
+        if key is None:
+            return _missing_member(n, default)
+        pos = _WHITESPACE.match(text, key.end()).end()
+        if text[pos:pos + 1] != ":":
+            raise ValueError(f"JSON 格式错误，位置 {pos}")
+        pos = _WHITESPACE.match(text, pos + 1).end()
+        if index == n:
+            return decode_value(text, pos)
+        # 跳过前面的成员值
+        try:
+            pos = _decoder.raw_decode(text, pos)[1]
+        except json.JSONDecodeError:
+            pos = _value_end(text, pos)
+        pos = _WHITESPACE.match(text, pos).end()
+        if text[pos:pos + 1] != ",":
+            return _missing_member(n, default)
+        pos = _WHITESPACE.match(text, pos + 1).end()
+    return _missing_member(n, default)
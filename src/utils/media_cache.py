@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+from .config import config
+from .logger import get_utils_logger
+
+__all__ = ["CachedMedia", "MediaCacheWriter", "MediaCache", "media_cache"]
+
+logger = get_utils_logger()
+
+
+@dataclass
+class CachedMedia:
+    """磁盘缓存中的一个媒体文件"""
+
+    key: str
+    url: str
+    path: str
+    size: int
+    content_type: str
+    # 强 ETag，由文件内容的 sha256 生成
+    etag: str
+    expires_at: float
+    accessed_at: float
+
+
+class MediaCacheWriter:
+    """
+    边下载边写入缓存
+
+    数据先写入唯一的临时文件，完整写完后通过原子重命名生效，并发的读取方不会看到不完整的文件；
+    超过单个文件的大小上限或中途放弃时删除临时文件
+    """
+
+    def __init__(self, cache: "MediaCache", key: str, url: str, content_type: str, ttl: Optional[float]):
+        self.cache = cache
+        self.key = key
+        self.url = url
+        self.content_type = content_type
+        self.ttl = ttl
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._tmp_path = f"{cache.object_path(key)}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(os.path.dirname(self._tmp_path), exist_ok=True)
+        self._file = open(self._tmp_path, "wb")
+
+    def write(self, chunk: bytes) -> bool:
+        """写入数据块，超过单个文件的大小上限或写入失败（如磁盘已满）时放弃缓存并返回 False"""
+        if self._file is None:
+            return False
+        self.size += len(chunk)
+        if self.size > self.cache.max_entry_bytes:
+            self.abort()
+            return False
+        try:
+            self._file.write(chunk)
+        except OSError as e:
+            logger.warning(f"写入媒体缓存失败，放弃缓存: {self.url}, {str(e)}")
+            self.abort()
+            return False
+        self._hash.update(chunk)
+        return True
+
+    def commit(self) -> Optional[CachedMedia]:
+        """写入完成，重命名为正式文件并登记到缓存，失败时放弃缓存并返回 None"""
+        if self._file is None:
+            return None
+        try:
+            self._file.close()
+            self._file = None
+            return self.cache._commit(self, self._tmp_path, f'"{self._hash.hexdigest()[:32]}"')
+        except OSError as e:
+            logger.warning(f"保存媒体缓存失败，放弃缓存: {self.url}, {str(e)}")
+            self._file = None
+            self.cache._remove(self._tmp_path)
+            return None
+
+    def abort(self):
+        """放弃写入，删除临时文件"""
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        self._file = None
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+class MediaCache:
+    """
+    图片、视频的磁盘 LRU 缓存
+
+    每个条目保存为 内容文件 + 元数据文件，启动时扫描目录重建索引；
+    条目有独立的过期时间，总大小超过预算时按最近访问时间淘汰。
+    最近访问时间记录为内容文件的 mtime，重启后淘汰顺序保持不变
+    """
+
+    def __init__(self, root: str, max_bytes: int, default_ttl: float, max_entry_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: Dict[str, CachedMedia] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(url: str, variant: str = "") -> str:
+        """缓存键：链接（去掉锚点）加上变体参数（如缩略图尺寸）的摘要"""
+        return hashlib.sha256(f"{url.split('#')[0]}|{variant}".encode("utf-8")).hexdigest()
+
+    def object_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _meta_path(self, key: str) -> str:
+        return f"{self.object_path(key)}.json"
+
+    def load(self):
+        """扫描缓存目录重建索引，清理过期条目和上次未写完的临时文件"""
+        if not os.path.isdir(self.root):
+            return
+        now = time.time()
+        entries: Dict[str, CachedMedia] = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if filename.endswith(".tmp"):
+                    self._remove(path)
+                    continue
+                if not filename.endswith(".json"):
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        entry = CachedMedia(**json.load(f))
+                except (OSError, ValueError, TypeError):
+                    self._remove(path)
+                    continue
+                try:
+                    mtime = os.path.getmtime(entry.path)
+                except OSError:
+                    mtime = None
+                if entry.expires_at <= now or mtime is None:
+                    self._remove(entry.path)
+                    self._remove(path)
+                    continue
+                entry.accessed_at = max(entry.accessed_at, mtime)
+                entries[entry.key] = entry
+        with self._lock:
+            self._entries = entries
+            self._total_bytes = sum(entry.size for entry in entries.values())
+            self._evict()
+        logger.info(f"已加载媒体缓存 {len(entries)} 个文件，共 {self._total_bytes} 字节: {self.root}")
+
+    def get(self, key: str) -> Optional[CachedMedia]:
+        """读取缓存条目，不存在、已过期或文件缺失时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.expires_at <= time.time() or not os.path.exists(entry.path)):
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            entry.accessed_at = time.time()
+            self.hits += 1
+        # 访问时间写入内容文件的 mtime，不必重写元数据
+        try:
+            os.utime(entry.path, (entry.accessed_at, entry.accessed_at))
+        except OSError:
+            pass
+        return entry
+
+    def open_writer(self, key: str, url: str, content_type: str, ttl: Optional[float] = None) -> MediaCacheWriter:
+        """创建写入器，通过 write/commit 写入一个条目"""
+        return MediaCacheWriter(self, key, url, content_type, ttl)
+
+    def put(self, key: str, url: str, data: bytes, content_type: str, ttl: Optional[float] = None) -> Optional[CachedMedia]:
+        """一次性写入完整内容，写入失败时返回 None"""
+        try:
+            writer = self.open_writer(key, url, content_type, ttl)
+        except OSError as e:
+            logger.warning(f"创建媒体缓存失败: {url}, {str(e)}")
+            return None
+        if not writer.write(data):
+            return None
+        return writer.commit()
+
+    def discard(self, key: str):
+        """删除缓存条目"""
+        with self._lock:
+            self._drop(key)
+
+    def stats(self) -> dict:
+        """返回缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def _commit(self, writer: MediaCacheWriter, tmp_path: str, etag: str) -> CachedMedia:
+        now = time.time()
+        ttl = writer.ttl if writer.ttl is not None else self.default_ttl
+        entry = CachedMedia(
+            key=writer.key,
+            url=writer.url,
+            path=self.object_path(writer.key),
+            size=writer.size,
+            content_type=writer.content_type,
+            etag=etag,
+            expires_at=now + ttl,
+            accessed_at=now,
+        )
+        with self._lock:
+            # 先替换内容文件再写元数据，重启时元数据存在即说明内容完整
+            meta_tmp = f"{self._meta_path(entry.key)}.{uuid.uuid4().hex}.tmp"
+            try:
+                os.replace(tmp_path, entry.path)
+                with open(meta_tmp, "w", encoding="utf-8") as f:
+                    json.dump(asdict(entry), f, ensure_ascii=False)
+                os.replace(meta_tmp, self._meta_path(entry.key))
+            except OSError:
+                # 内容文件可能已被替换，旧条目不再可信，一并删除
+                self._remove(meta_tmp)
+                self._drop(entry.key)
+                self._remove(entry.path)
+                raise
+
+            previous = self._entries.get(entry.key)
+            if previous is not None:
+                self._total_bytes -= previous.size
+            self._entries[entry.key] = entry
+            self._total_bytes += entry.size
+            self._evict()
+        return entry
+
+    def _evict(self):
+        """清理过期条目，超过大小预算时按最近访问时间淘汰"""
+        now = time.time()
+        for key in [key for key, entry in self._entries.items() if entry.expires_at <= now]:
+            self._drop(key)
+        if self._total_bytes <= self.max_bytes:
+            return
+        for entry in sorted(self._entries.values(), key=lambda entry: entry.accessed_at):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._drop(entry.key)
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry.size
+        # 正在读取该文件的请求已持有文件句柄，删除不影响其读取
+        self._remove(self._meta_path(key))
+        self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# 进程级共享的媒体缓存
+media_cache = MediaCache(
+    root=config.MEDIA_CACHE_DIR,
+    max_bytes=config.MEDIA_CACHE_MAX_BYTES,
+    default_ttl=config.MEDIA_CACHE_TTL,
+    max_entry_bytes=config.MEDIA_CACHE_MAX_ENTRY_BYTES,
+)
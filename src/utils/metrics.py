@@ -0,0 +1,191 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .timing import Histogram, phase_histograms
+
+__all__ = [
+    "HistogramFamily",
+    "MetricFamily",
+    "register_collector",
+    "render_metrics",
+    "request_duration",
+    "fetch_duration",
+    "MetricsMiddleware",
+    "CONTENT_TYPE",
+]
+
+# Prometheus 文本格式的响应类型
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Dict[str, str]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricFamily:
+    """
+    一个指标及其所有样本，由采集函数在抓取时生成
+
+    类型为 gauge 或 counter，样本为 (标签, 值)
+    """
+
+    def __init__(self, name: str, type: str, help: str, samples: Optional[List[Tuple[Labels, float]]] = None):
+        self.name = name
+        self.type = type
+        self.help = help
+        self.samples = samples if samples is not None else []
+
+    def add(self, value: float, **labels: str) -> "MetricFamily":
+        self.samples.append((labels, value))
+        return self
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for labels, value in self.samples:
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class HistogramFamily:
+    """
+    按标签区分的耗时直方图
+
+    观测值以毫秒记录（与 timing.Histogram 一致），输出时换算为秒，符合 Prometheus 的命名习惯
+    """
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Histogram:
+        histogram = self._children.get(values)
+        if histogram is None:
+            with self._lock:
+                histogram = self._children.setdefault(values, Histogram())
+        return histogram
+
+    def observe(self, duration_ms: float, *values: str):
+        self.labels(*values).observe(duration_ms)
+
+    def render(self) -> List[str]:
+        return _render_histograms(
+            self.name,
+            self.help,
+            [(dict(zip(self.label_names, values)), histogram.snapshot())
+             for values, histogram in list(self._children.items())],
+        )
+
+
+def _render_histograms(name: str, help: str, snapshots: List[Tuple[Labels, dict]]) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+    for labels, snapshot in snapshots:
+        for bound, count in snapshot["buckets"]:
+            le = bound if bound == float("inf") else bound / 1000
+            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(le)})} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(snapshot['sum'] / 1000)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+    return lines
+
+
+# 入站请求耗时，route 使用路由模板（如 /analyze/jobs/{job_id}），避免标签基数膨胀
+request_duration = HistogramFamily(
+    "http_request_duration_seconds", "入站请求耗时", ("method", "route", "status")
+)
+# 出站请求耗时，按目标主机区分
+fetch_duration = HistogramFamily(
+    "outbound_fetch_duration_seconds", "出站请求耗时", ("host", "outcome")
+)
+
+_collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+_in_flight = 0
+
+
+def register_collector(collector: Callable[[], Iterable[MetricFamily]]):
+    """
+    注册采集函数，在每次抓取指标时调用
+
+    用于连接池、缓存、队列等已有统计信息的模块，平时不产生任何开销
+    """
+    _collectors.append(collector)
+
+
+def _phase_metrics() -> List[str]:
+    return _render_histograms(
+        "request_phase_duration_seconds",
+        "请求内各阶段耗时（fetch、parse、matting 等）",
+        [({"phase": name}, snapshot) for name, snapshot in sorted(phase_histograms().items())],
+    )
+
+
+def render_metrics() -> str:
+    """生成 Prometheus 文本格式的全部指标"""
+    lines = [
+        "# HELP http_requests_in_flight 正在处理的入站请求数",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {_in_flight}",
+    ]
+    lines += request_duration.render()
+    lines += fetch_duration.render()
+    lines += _phase_metrics()
+    for collector in _collectors:
+        for family in collector():
+            lines += family.render()
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """统计正在处理的请求数和按路由区分的请求耗时"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _in_flight
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _in_flight -= 1
+            # 路由匹配后 Starlette 会把路由写入 scope，未匹配的请求统一归为 unmatched
+            route = scope.get("route")
+            request_duration.observe(
+                (time.perf_counter() - start) * 1000,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            )
@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+from .cache import TTLCache
+from .config import config
+from .logger import get_utils_logger
+
+__all__ = ["ShortLinkCache", "short_link_cache", "is_short_link"]
+
+logger = get_utils_logger()
+
+
+def is_short_link(url: str) -> bool:
+    """判断是否为各平台的分享短链"""
+    host = (urlparse(url).hostname or "").lower()
+    return any(
+        host == short_host or host.endswith("." + short_host)
+        for short_host in config.SHORT_LINK_HOSTS
+    )
+
+
+class ShortLinkCache(TTLCache):
+    """
+    短链 -> 最终链接 的缓存
+
+    命中后解析类可以直接请求最终链接，省去重定向的往返；
+    可选地持久化到 storage/ 目录，重启后依然有效
+    """
+
+    def __init__(self, max_size: int, default_ttl: float, persist_path: Optional[str] = None):
+        super().__init__(max_size, default_ttl)
+        self.persist_path = persist_path
+
+    def resolve(self, url: str) -> Optional[str]:
+        """返回短链对应的最终链接，未缓存时返回 None"""
+        if not is_short_link(url):
+            return None
+        return self.get(url.split("#")[0])
+
+    def remember(self, short_url: str, final_url: str):
+        """记录短链解析结果，应只在最终页面成功解析后调用"""
+        if final_url and final_url != short_url and is_short_link(short_url):
+            self.set(short_url.split("#")[0], final_url)
+
+    def forget(self, short_url: str):
+        """删除短链解析结果，如最终页面已失效或解析失败"""
+        if is_short_link(short_url):
+            self.delete(short_url.split("#")[0])
+
+    def load(self):
+        """从磁盘加载未过期的短链记录"""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            now = time.time()
+            for short_url, (final_url, expires_at) in records.items():
+                if expires_at > now:
+                    self.set(short_url, final_url, expires_at - now)
+            logger.info(f"已加载短链缓存 {len(self)} 条: {self.persist_path}")
+        except Exception as e:
+            logger.error(f"加载短链缓存失败: {str(e)}", exc_info=True)
+
+    def save(self):
+        """将短链记录写入磁盘，先写临时文件再原子替换"""
+        if not self.persist_path:
+            return
+        try:
+            now = time.time()
+            records = {key: [value, now + ttl] for key, value, ttl in self.items()}
+            os.makedirs(os.path.dirname(self.persist_path), exist_ok=True)
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+            logger.info(f"已保存短链缓存 {len(records)} 条: {self.persist_path}")
+        except Exception as e:
+            logger.error(f"保存短链缓存失败: {str(e)}", exc_info=True)
+
+
+# 进程级共享的短链缓存
+short_link_cache = ShortLinkCache(
+    max_size=config.SHORT_LINK_CACHE_MAX_SIZE,
+    default_ttl=config.SHORT_LINK_CACHE_TTL,
+    persist_path=config.SHORT_LINK_CACHE_FILE if config.SHORT_LINK_CACHE_PERSIST else None,
+)
@@ -0,0 +1,55 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+__all__ = ["SingleFlight"]
+
+
+class SingleFlight:
+    """
+    合并并发的相同请求
+
+    同一个键的第一个调用者真正执行任务，执行期间到达的相同请求直接等待同一个结果；
+    任务以独立的 Task 运行，某个调用者断开（被取消）不会影响其他等待者
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行任务，相同键的并发调用共享结果
+
+        参数:
+            key: 请求的唯一标识
+            fn: 返回协程的函数，只有第一个调用者会执行
+
+        返回:
+            任务结果，任务抛出的异常会传递给所有等待者
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: Hashable, task: asyncio.Task):
+        """任务结束后移除记录"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 取出异常，避免所有调用者都已取消时出现 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        """返回合并统计信息"""
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,345 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import config
+from .errors import LinkUnavailableError
+from .logger import get_utils_logger
+
+try:
+    import zstandard
+except ImportError:  # 未安装时使用 gzip
+    zstandard = None
+
+__all__ = ["FetchedPage", "SnapshotStore", "snapshot_store", "snapshot_ttl", "fetch_page"]
+
+logger = get_utils_logger()
+
+
+@dataclass
+class FetchedPage:
+    """
+    抓取到的页面
+
+    与 httpx.Response 一样提供 url、text 和 status_code，解析类的 _parse_response 可以直接使用
+    """
+
+    url: str
+    text: str
+    status_code: int = 200
+    from_snapshot: bool = False
+    # 流式获取提前停止时为 False，text 只包含页面前部
+    complete: bool = True
+
+
+def _compress(data: bytes) -> Tuple[bytes, str]:
+    """压缩页面内容，返回 (数据, 编码)"""
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data), "zstd"
+    return gzip.compress(data, compresslevel=6), "gzip"
+
+
+def _decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        if zstandard is None:
+            raise ValueError("快照使用 zstd 压缩，但未安装 zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SnapshotStore:
+    """
+    页面 HTML 的磁盘快照
+
+    页面内容压缩后按 sha256 存储，相同内容只保存一份；
+    索引记录 链接 -> 内容摘要、最终链接、过期时间和最近访问时间，
+    总大小超过预算时按最近访问时间淘汰；
+    流式获取提前停止得到的页面前部标记为 partial，只提供给同样只需要页面前部的调用方
+    """
+
+    def __init__(self, root: str, max_bytes: int, default_ttl: float, flush_interval: float = 30.0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # 索引修改后最多间隔多久写入磁盘，关闭时再写入一次
+        self.flush_interval = flush_interval
+        self.index_path = os.path.join(root, "index.json")
+        # url -> {digest, final_url, encoding, size, expires_at, accessed_at, partial}
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        # 串行化索引文件的写入，写入期间不占用 _lock
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._last_saved = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return url.split("#")[0]
+
+    def _object_path(self, digest: str, encoding: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.html.{encoding}")
+
+    def load(self):
+        """从磁盘加载索引，丢弃已过期或内容文件缺失的记录"""
+        with self._lock:
+            if not os.path.exists(self.index_path):
+                return
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+                now = time.time()
+                self._entries = {
+                    url: entry
+                    for url, entry in entries.items()
+                    if entry["expires_at"] > now
+                    and os.path.exists(self._object_path(entry["digest"], entry["encoding"]))
+                }
+                logger.info(f"已加载页面快照索引 {len(self._entries)} 条: {self.index_path}")
+            except Exception as e:
+                logger.error(f"加载页面快照索引失败: {str(e)}", exc_info=True)
+
+    def save(self):
+        """将索引写入磁盘，先写临时文件再原子替换"""
+        with self._save_lock:
+            with self._lock:
+                entries = {url: dict(entry) for url, entry in self._entries.items()}
+                self._dirty = False
+                self._last_saved = time.monotonic()
+            self._save_index(entries)
+
+    def flush(self):
+        """索引有修改且距离上次写入超过 flush_interval 时写入磁盘"""
+        if self._dirty and time.monotonic() - self._last_saved >= self.flush_interval:
+            self.save()
+
+    def get(self, url: str, allow_expired: bool = False, allow_partial: bool = False) -> Optional[FetchedPage]:
+        """
+        读取链接的快照
+
+        参数:
+            url: 请求链接
+            allow_expired: 是否返回已过期的快照，用于离线重放
+            allow_partial: 是否返回只包含页面前部的快照
+
+        返回:
+            快照页面，不存在、已过期或只有页面前部而调用方需要完整页面时返回 None
+        """
+        key = self._key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is None
+                or (not allow_expired and entry["expires_at"] <= time.time())
+                or (not allow_partial and entry.get("partial", False))
+            ):
+                self.misses += 1
+                return None
+            entry["accessed_at"] = time.time()
+            self._dirty = True
+            path = self._object_path(entry["digest"], entry["encoding"])
+            encoding = entry["encoding"]
+            final_url = entry["final_url"]
+            partial = entry.get("partial", False)
+
+        # 读取和解压在锁外进行，不阻塞其他线程的查找和统计
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            text = _decompress(data, encoding).decode("utf-8")
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取页面快照失败，已丢弃: {url}, {str(e)}")
+            with self._lock:
+                # 期间记录可能已被新的快照替换，只删除读取失败的那一条
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+                    self._dirty = True
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return FetchedPage(url=final_url, text=text, from_snapshot=True, complete=not partial)
+
+    def put(self, url: str, page: FetchedPage, ttl: Optional[float] = None):
+        """
+        保存页面快照，请求链接和最终链接都指向同一份内容
+
+        参数:
+            url: 请求链接（如短链）
+            page: 抓取到的页面
+            ttl: 过期时间（秒），默认使用构造时的配置
+        """
+        raw = page.text.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        data, encoding = _compress(raw)
+        path = self._object_path(digest, encoding)
+        now = time.time()
+        entry = {
+            "digest": digest,
+            "final_url": page.url,
+            "encoding": encoding,
+            "size": len(data),
+            "expires_at": now + (ttl if ttl is not None else self.default_ttl),
+            "accessed_at": now,
+            "partial": not page.complete,
+        }
+        # 内容文件在锁外写入，同一内容的并发写入各用各的临时文件，替换结果相同
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        with self._lock:
+            replaced = []
+            for key in {self._key(url), self._key(page.url)}:
+                if key in self._entries:
+                    replaced.append(self._entries[key])
+                self._entries[key] = dict(entry)
+            self._evict(replaced)
+            self._dirty = True
+        self.flush()
+
+    def discard(self, url: str):
+        """删除链接的快照记录，如页面已确认失效"""
+        with self._lock:
+            entry = self._entries.pop(self._key(url), None)
+            if entry is not None:
+                self._evict([entry])
+                self._dirty = True
+        self.flush()
+
+    def entries(self) -> List[Tuple[str, dict]]:
+        """返回所有快照记录的副本，用于离线重放"""
+        with self._lock:
+            return [(url, dict(entry)) for url, entry in self._entries.items()]
+
+    def stats(self) -> dict:
+        """返回快照统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "objects": len({entry["digest"] for entry in self._entries.values()}),
+                "bytes": self._total_bytes(),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def _total_bytes(self) -> int:
+        objects = {entry["digest"]: entry["size"] for entry in self._entries.values()}
+        return sum(objects.values())
+
+    def _evict(self, replaced: List[dict]):
+        """清理过期记录，超过大小预算时按最近访问时间淘汰"""
+        now = time.time()
+        before = list(self._entries.values()) + replaced
+        self._entries = {url: entry for url, entry in self._entries.items() if entry["expires_at"] > now}
+        total = self._total_bytes()
+        if total > self.max_bytes:
+            # 同一内容的多个链接按其中最近的一次访问计算
+            last_access: Dict[str, float] = {}
+            sizes: Dict[str, int] = {}
+            for entry in self._entries.values():
+                digest = entry["digest"]
+                last_access[digest] = max(last_access.get(digest, 0), entry["accessed_at"])
+                sizes[digest] = entry["size"]
+            evicted = set()
+            for digest in sorted(last_access, key=last_access.get):
+                if total <= self.max_bytes:
+                    break
+                evicted.add(digest)
+                total -= sizes[digest]
+                self.evictions += 1
+            self._entries = {
+                url: entry for url, entry in self._entries.items() if entry["digest"] not in evicted
+            }
+        # 删除不再被任何记录引用的内容文件
+        referenced = {entry["digest"] for entry in self._entries.values()}
+        removed = {(entry["digest"], entry["encoding"]) for entry in before}
+        for digest, encoding in removed:
+            if digest not in referenced:
+                try:
+                    os.remove(self._object_path(digest, encoding))
+                except OSError:
+                    pass
+
+    def _save_index(self, entries: Dict[str, dict]):
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.error(f"保存页面快照索引失败: {str(e)}", exc_info=True)
+
+
+def snapshot_ttl(platform: Optional[str] = None) -> float:
+    """
+    平台页面快照的有效期，不超过该平台解析结果的缓存时间
+
+    快照中的视频、图片链接带有签名和时效，结果缓存过期后不应再从更旧的快照中解析出来
+    """
+    result_ttl = config.ANALYZE_CACHE_TTL.get(platform, config.ANALYZE_CACHE_DEFAULT_TTL)
+    return min(config.SNAPSHOT_TTL, result_ttl)
+
+
+# 进程级共享的页面快照
+snapshot_store = SnapshotStore(
+    root=config.SNAPSHOT_DIR,
+    max_bytes=config.SNAPSHOT_MAX_BYTES,
+    default_ttl=config.SNAPSHOT_TTL,
+    flush_interval=config.SNAPSHOT_INDEX_FLUSH_INTERVAL,
+)
+
+
+async def fetch_page(
+    url: str,
+    headers: Optional[dict] = None,
+    until: Optional[Callable[[str], bool]] = None,
+    ttl: Optional[float] = None,
+) -> FetchedPage:
+    """
+    获取页面，未过期的快照直接返回，否则请求并保存快照（ttl 为快照有效期，解析类传入 snapshot_ttl(平台)）
+
+    指定 until 时流式读取，已读取的内容满足条件即停止，得到的页面前部保存为 partial 快照，
+    之后只提供给同样指定了 until 的调用（同一链接的解析类使用相同的停止条件）；
+    页面返回 404/410 时抛出 LinkUnavailableError；
+    磁盘读写放到线程中执行，不阻塞事件循环
+    """
+    from . import http_client
+
+    if config.SNAPSHOT_ENABLED:
+        page = await asyncio.to_thread(snapshot_store.get, url, False, until is not None)
+        if page is not None:
+            logger.info(f"命中页面快照: {url}")
+            return page
+
+    if until is not None and config.STREAM_EARLY_STOP:
+        response, text, complete = await http_client.fetch_until(url, headers, until)
+    else:
+        response = await http_client.fetch(url, headers=headers)
+        text, complete = response.text, True
+    if response.status_code in (404, 410):
+        raise LinkUnavailableError(f"链接已失效: {response.url} ({response.status_code})", str(response.url))
+    page = FetchedPage(
+        url=str(response.url), text=text, status_code=response.status_code, complete=complete
+    )
+    if config.SNAPSHOT_ENABLED and response.status_code == 200:
+        try:
+            await asyncio.to_thread(snapshot_store.put, url, page, ttl)
+        except Exception as e:
+            logger.error(f"保存页面快照失败: {url}, {str(e)}", exc_info=True)
+    return page
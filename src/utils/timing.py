@@ -0,0 +1,141 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+__all__ = [
+    "Histogram",
+    "RequestTimings",
+    "phase",
+    "record",
+    "current_timings",
+    "phase_histograms",
+    "TimingMiddleware",
+]
+
+# 直方图的桶上限（毫秒）
+DEFAULT_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """固定桶的累积直方图，只记录次数和总和，开销很小"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> dict:
+        """返回各桶的累积次数（含 +Inf）、总次数和总和"""
+        with self._lock:
+            cumulative = []
+            total = 0
+            for bound, count in zip(list(self.buckets) + [float("inf")], self.counts):
+                total += count
+                cumulative.append((bound, total))
+            return {"buckets": cumulative, "count": self.count, "sum": self.sum}
+
+
+class RequestTimings:
+    """单个请求内各阶段的耗时（毫秒），同名阶段累加"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, duration_ms: float):
+        self.phases[name] = self.phases.get(name, 0.0) + duration_ms
+
+    def server_timing(self) -> str:
+        """生成 Server-Timing 响应头的值"""
+        return ", ".join(f"{name};dur={duration:.1f}" for name, duration in self.phases.items())
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+_histograms: Dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def _histogram(name: str) -> Histogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(name, Histogram())
+    return histogram
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """当前请求的阶段耗时，不在请求上下文中时返回 None"""
+    return _current.get()
+
+
+def record(name: str, duration_ms: float):
+    """记录一个阶段的耗时：写入当前请求的 Server-Timing 和进程内直方图"""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, duration_ms)
+    _histogram(name).observe(duration_ms)
+
+
+@contextmanager
+def phase(name: str):
+    """
+    统计代码块耗时
+
+    用法:
+        with phase("fetch"):
+            response = await fetch_page(url)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - start) * 1000)
+
+
+def phase_histograms() -> Dict[str, dict]:
+    """返回所有阶段的直方图快照"""
+    return {name: histogram.snapshot() for name, histogram in list(_histograms.items())}
+
+
+class TimingMiddleware:
+    """
+    为每个请求建立阶段耗时上下文，并在响应头中添加 Server-Timing
+
+    使用纯 ASGI 中间件，路由处理函数（包括线程池中执行的同步函数）与中间件共享同一个上下文
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timings.add("total", (time.perf_counter() - start) * 1000)
+                headers: List = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)